@@ -0,0 +1,36 @@
+"""Add shard claims
+
+Revision ID: 3b8d5f1e6a27
+Revises: e7a2c9f4b1d6
+Create Date: 2026-10-17 18:05:41.208316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8d5f1e6a27'
+down_revision: Union[str, Sequence[str], None] = 'e7a2c9f4b1d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('shard_claims',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('bar_close', sa.BigInteger(), nullable=False),
+    sa.Column('worker_id', sa.String(), nullable=False),
+    sa.Column('claimed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'bar_close')
+    )
+    op.create_index(op.f('ix_shard_claims_bar_close'), 'shard_claims', ['bar_close'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_shard_claims_bar_close'), table_name='shard_claims')
+    op.drop_table('shard_claims')
@@ -0,0 +1,37 @@
+"""Add shard leases
+
+Revision ID: c4e1b7d2a9f3
+Revises: 9a33541dd608
+Create Date: 2026-10-17 09:12:41.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e1b7d2a9f3'
+down_revision: Union[str, Sequence[str], None] = '9a33541dd608'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('shard_leases',
+    sa.Column('worker_id', sa.String(), nullable=False),
+    sa.Column('host', sa.String(), nullable=True),
+    sa.Column('pid', sa.Integer(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('worker_id')
+    )
+    op.create_index(op.f('ix_shard_leases_expires_at'), 'shard_leases', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_shard_leases_expires_at'), table_name='shard_leases')
+    op.drop_table('shard_leases')
@@ -0,0 +1,36 @@
+"""Add bot state changes
+
+Revision ID: e7a2c9f4b1d6
+Revises: c4e1b7d2a9f3
+Create Date: 2026-10-17 15:40:12.511904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2c9f4b1d6'
+down_revision: Union[str, Sequence[str], None] = 'c4e1b7d2a9f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('bot_state_changes',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bot_state_changes_changed_at'), 'bot_state_changes', ['changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_bot_state_changes_changed_at'), table_name='bot_state_changes')
+    op.drop_table('bot_state_changes')
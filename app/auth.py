@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 # Local imports
 from app.database import get_db, fake_users_db, get_user as get_user_from_db
 from app.models import User as DBUser
+from app.security import token_cache
 from app.utils import hash_password, verify_password  # Optional utility functions
 
 # === Config ===
@@ -109,6 +110,7 @@ def change_password(req: ChangePasswordRequest):
     if not user or not pwd_context.verify(req.old_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Invalid credentials")
     fake_users_db[req.username]["hashed_password"] = pwd_context.hash(req.new_password)
+    token_cache.invalidate(subject=req.username)
     return {"msg": "Password changed successfully"}
 
 @auth_router.post("/reset-password")
@@ -117,6 +119,7 @@ def reset_password(username: str = Body(...), new_password: str = Body(...)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     fake_users_db[username]["hashed_password"] = pwd_context.hash(new_password)
+    token_cache.invalidate(subject=username)
     return {"msg": "Password reset successfully"}
 
 
@@ -8,3 +8,13 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
 DATABASE_URL = "sqlite:///./users.db"
+
+# === Database connection pools (ignored for SQLite) ===
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # connections kept open per engine
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))  # extra connections allowed under burst load
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced
+
+# === Verified-token cache ===
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))  # verified tokens kept before the least recently used is evicted
+TOKEN_CACHE_MAX_TTL = float(os.getenv("TOKEN_CACHE_MAX_TTL", "900"))  # seconds an entry lives even if the token's exp is later
@@ -1,16 +1,107 @@
 # app/database.py
 
+import os
+import random
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT
 
 # Update this with your actual DB URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"  # or use PostgreSQL/MySQL
+SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL", "sqlite:///./test.db")  # or use PostgreSQL/MySQL
+# Comma-separated read replica URLs; reads stay on the primary when empty
+SQLALCHEMY_REPLICA_URLS = [url.strip() for url in os.getenv("SQLALCHEMY_REPLICA_URLS", "").split(",") if url.strip()]
+
+# Async drivers used for the same database by the async engine
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mariadb": "mariadb+aiomysql",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Swap a sync driver for its async counterpart, e.g. sqlite:// -> sqlite+aiosqlite://."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} URLs")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> dict:
+    """Pool settings for server databases; SQLite only needs cross-thread access."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain reads to one replica (picked per session) and
+    writes, flushes and locking reads to its bound primary. After the first
+    write everything stays on the primary, so a request reads its own writes.
+    """
+
+    def __init__(self, replicas=(), **kw):
+        super().__init__(**kw)
+        self.replica = random.choice(replicas) if replicas else None
+        self.pinned = self.replica is None
+
+    def use_primary(self):
+        """Route every following statement to the primary, e.g. before a read-modify-write."""
+        self.pinned = True
+        return self
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self.pinned and (
+            self._flushing
+            or getattr(clause, "is_dml", False)
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            self.pinned = True
+        if self.pinned:
+            return super().get_bind(mapper, clause=clause, **kw)
+        return self.replica
+
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}  # for SQLite only
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+replica_engines = [create_engine(url, **engine_options(url)) for url in SQLALCHEMY_REPLICA_URLS]
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, replicas=replica_engines)
+# Primary-only sessions for coordination state that must never be read stale (e.g. shard leases)
+PrimarySessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engines for async routes, so database I/O does not block the event loop. Built on
+# first use: a backend without an async driver only breaks those routes, not this import.
+async_engines = []  # [primary, *replicas] once built
+_async_sessionmaker = None
+
+
+def get_async_sessionmaker():
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        primary = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL),
+                                      **engine_options(SQLALCHEMY_DATABASE_URL))
+        replicas = [create_async_engine(async_database_url(url), **engine_options(url))
+                    for url in SQLALCHEMY_REPLICA_URLS]
+        async_engines[:] = [primary, *replicas]
+        _async_sessionmaker = async_sessionmaker(
+            primary, class_=AsyncSession, sync_session_class=RoutingSession, autoflush=False,
+            expire_on_commit=False, replicas=[replica.sync_engine for replica in replicas],
+        )
+    return _async_sessionmaker
 
 Base = declarative_base()
 
@@ -20,6 +111,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_write_db():
+    db = SessionLocal().use_primary()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+async def get_async_write_db():
+    async with get_async_sessionmaker()() as db:
+        db.sync_session.use_primary()
+        yield db
+
+def dispose_inherited_pools():
+    """Drop pooled connections inherited across fork without closing them, so the parent's stay usable."""
+    for pooled_engine in [engine, *replica_engines, *(async_pooled.sync_engine for async_pooled in async_engines)]:
+        pooled_engine.dispose(close=False)
+
+async def dispose_async_engines():
+    """Close pooled async connections; aiosqlite keeps a thread open per connection."""
+    for pooled_engine in async_engines:
+        await pooled_engine.dispose()
 # Simulated fake user database
 fake_users_db = {
     "admin": {
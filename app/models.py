@@ -1,6 +1,8 @@
 # app/models.py
 
-from sqlalchemy import Column, Integer, String
+import datetime
+
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Integer, String
 from .database import Base
 
 class User(Base):
@@ -10,5 +12,38 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
     password = Column(String)
+    # Engine columns, as created by the initial migration
+    bot_active = Column(Boolean, nullable=False, default=False)
+    metaapi_token = Column(String, nullable=True)
+    account_id = Column(String, nullable=True)
     # add other fields...
 
+class ShardLease(Base):
+    __tablename__ = "shard_leases"
+    __table_args__ = {'extend_existing': True}
+
+    worker_id = Column(String, primary_key=True)
+    host = Column(String)
+    pid = Column(Integer)
+    heartbeat_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class ShardClaim(Base):
+    """One row per (user, bar close): the worker that inserted it first runs that user's cycle."""
+    __tablename__ = "shard_claims"
+    __table_args__ = {'extend_existing': True}
+
+    user_id = Column(Integer, primary_key=True)
+    bar_close = Column(BigInteger, primary_key=True, index=True)
+    worker_id = Column(String, nullable=False)
+    claimed_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+class BotStateChange(Base):
+    """Append-only log of /bot/start and /bot/stop, polled by engine processes to update their registry."""
+    __tablename__ = "bot_state_changes"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False)
+    active = Column(Boolean, nullable=False)
+    changed_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow, index=True)
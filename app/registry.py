@@ -0,0 +1,186 @@
+import asyncio
+import datetime
+import time
+
+from sqlalchemy import func
+
+from config import REGISTRY_CHANGE_RETENTION, REGISTRY_RECONCILE_INTERVAL
+from app.database import SessionLocal
+from app.models import BotStateChange, User
+
+
+class ActiveUser:
+    """Immutable record of what the engine needs to run a user's cycle."""
+
+    __slots__ = ("id", "metaapi_token", "account_id")
+
+    def __init__(self, id, metaapi_token, account_id):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "metaapi_token", metaapi_token)
+        object.__setattr__(self, "account_id", account_id)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ActiveUser records are immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, ActiveUser) and (self.id, self.metaapi_token, self.account_id) == (
+            other.id, other.metaapi_token, other.account_id)
+
+    def __hash__(self):
+        return hash((self.id, self.metaapi_token, self.account_id))
+
+    def __repr__(self):
+        return f"ActiveUser(id={self.id!r}, account_id={self.account_id!r})"
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.metaapi_token, user.account_id)
+
+
+class ActiveUserRegistry:
+    """
+    In-process set of users with the bot switched on.
+
+    Loaded once from the database, then kept current by the /bot/start and
+    /bot/stop routes. Those routes also append to `bot_state_changes`, which
+    engine processes poll with one primary-key range query per tick
+    (sync_changes), so a stop reaches them before their next cycle. A
+    periodic reconciliation query is the safety net for anything else
+    (direct SQL, lost log rows). users() returns a cached tuple, so
+    per-user cycles do no database reads.
+    """
+
+    def __init__(self, session_factory=SessionLocal, interval=REGISTRY_RECONCILE_INTERVAL,
+                 change_retention=REGISTRY_CHANGE_RETENTION):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.change_retention = change_retention
+        self._users = {}  # user id -> ActiveUser
+        self._snapshot = ()
+        self._task = None
+        self._change_cursor = 0  # highest bot_state_changes id applied
+        self.loaded_at = None
+        self.reconciliations = 0
+        self.changes_applied = 0
+        self.drift = 0  # records the reconciliation had to correct
+
+    def users(self):
+        return self._snapshot
+
+    def get(self, user_id):
+        return self._users.get(user_id)
+
+    def __len__(self):
+        return len(self._users)
+
+    def activate(self, user):
+        record = user if isinstance(user, ActiveUser) else ActiveUser.from_user(user)
+        if self._users.get(record.id) != record:
+            self._users[record.id] = record
+            self._publish()
+
+    def deactivate(self, user_id):
+        if self._users.pop(user_id, None) is not None:
+            self._publish()
+
+    def _publish(self):
+        # A new tuple per change; cycles holding the old one are unaffected
+        self._snapshot = tuple(self._users.values())
+
+    def reconcile(self) -> int:
+        """Reload active users from the database (columns only) and return how many records changed."""
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.change_retention)
+        db = self.session_factory()
+        try:
+            # Cursor first: changes committed while loading are applied again by sync_changes, which is idempotent
+            cursor = db.query(func.max(BotStateChange.id)).scalar() or 0
+            rows = db.query(User.id, User.metaapi_token, User.account_id).filter(User.bot_active == True).all()
+            db.query(BotStateChange).filter(BotStateChange.changed_at < cutoff).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        self._change_cursor = max(self._change_cursor, cursor)
+        users = {row[0]: ActiveUser(*row) for row in rows}
+        changed = len(users.keys() ^ self._users.keys()) + sum(
+            1 for user_id, record in users.items() if user_id in self._users and self._users[user_id] != record
+        )
+        self._users = users
+        self._publish()
+        self.loaded_at = time.time()
+        self.reconciliations += 1
+        if self.reconciliations > 1:
+            self.drift += changed
+        return changed
+
+    def sync_changes_blocking(self) -> int:
+        """Apply bot start/stop changes logged since the last call and return how many users they touched."""
+        db = self.session_factory()
+        try:
+            changes = db.query(BotStateChange.id, BotStateChange.user_id).filter(
+                BotStateChange.id > self._change_cursor).order_by(BotStateChange.id).all()
+            if not changes:
+                return 0
+            user_ids = {user_id for _, user_id in changes}
+            # Current state rather than replaying the log, so ordering and duplicates do not matter
+            rows = db.query(User.id, User.metaapi_token, User.account_id).filter(
+                User.id.in_(user_ids), User.bot_active == True).all()
+        finally:
+            db.close()
+        active = {row[0]: ActiveUser(*row) for row in rows}
+        for user_id in user_ids:
+            if user_id in active:
+                self._users[user_id] = active[user_id]
+            else:
+                self._users.pop(user_id, None)
+        self._publish()
+        self._change_cursor = changes[-1][0]
+        self.changes_applied += len(user_ids)
+        return len(user_ids)
+
+    async def sync_changes(self):
+        """Called by the scheduler before every tick."""
+        try:
+            touched = await asyncio.to_thread(self.sync_changes_blocking)
+            if touched:
+                print(f"[REGISTRY] Applied bot start/stop for {touched} user(s)")
+        except Exception as e:
+            print(f"[REGISTRY][ERROR] Change poll failed: {e}")
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        await asyncio.to_thread(self.reconcile)
+        print(f"[REGISTRY] Loaded {len(self._users)} active user(s)")
+        if not self.running:
+            self._task = asyncio.create_task(self._reconcile_forever())
+
+    async def _reconcile_forever(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                changed = await asyncio.to_thread(self.reconcile)
+                if changed:
+                    print(f"[REGISTRY] Reconciliation corrected {changed} record(s)")
+            except Exception as e:
+                print(f"[REGISTRY][ERROR] Reconciliation failed: {e}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self):
+        return {
+            "active": len(self._users),
+            "reconciliations": self.reconciliations,
+            "changes_applied": self.changes_applied,
+            "drift": self.drift,
+            "loaded_at": self.loaded_at,
+        }
+
+
+# Shared registry used by the engine and the bot routes
+active_users = ActiveUserRegistry()
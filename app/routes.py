@@ -3,23 +3,25 @@ from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from typing import Optional
 from datetime import timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.auth import router as auth_router
 from app.bot import bot_router
 from app.auth import auth_router
-from app.auth import get_current_user
 
 from app import models, schemas, auth, database
 from app.auth import (
     router as auth_router,
-    get_current_user,
     register_user,
     login,
     reset_password,
     change_password,
 )
 from app.config import ACCESS_TOKEN_EXPIRE_MINUTES
-from app.database import get_db
+from app.database import get_async_db, get_async_write_db, get_db
+from app.registry import active_users
+from app.security import get_current_user, token_cache
 from execution import run_trading_for_user
 
 # --- Main Unified Router ---
@@ -65,7 +67,7 @@ def change(data: ChangePasswordRequest, user=Depends(get_current_user), db: Sess
 
 @router.get("/me")
 def get_profile(user=Depends(get_current_user)):
-    return {"user": user}
+    return {"user": user.as_dict()}
 
 # --- Manual Auth Routes ---
 @router.post("/manual-register", response_model=schemas.UserResponse)
@@ -92,28 +94,40 @@ def manual_login(user: schemas.UserLogin, db: Session = Depends(get_db)):
     return {"access_token": token, "token_type": "bearer"}
 
 # --- Bot Control ---
+async def _get_user(db: AsyncSession, user_id: int):
+    result = await db.execute(select(models.User).where(models.User.id == user_id))
+    return result.scalar_one_or_none()
+
 @router.post("/bot/start")
-def start_bot(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+async def start_bot(user_id: int, db: AsyncSession = Depends(get_async_write_db)):
+    user = await _get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.bot_active = True
-    db.commit()
+    # Logged in the same transaction so engine processes pick it up before their next tick
+    db.add(models.BotStateChange(user_id=user.id, active=True))
+    await db.commit()
+    active_users.activate(user)
+    token_cache.invalidate(user_id=user.id)
     return {"message": "Bot started for user"}
 
 @router.post("/bot/stop")
-def stop_bot(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+async def stop_bot(user_id: int, db: AsyncSession = Depends(get_async_write_db)):
+    user = await _get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.bot_active = False
-    db.commit()
+    db.add(models.BotStateChange(user_id=user.id, active=False))
+    await db.commit()
+    active_users.deactivate(user.id)
+    token_cache.invalidate(user_id=user.id)
     return {"message": "Bot stopped for user"}
 
 # --- Trade Execution ---
 @router.post("/trade/{user_id}")
-async def trade_for_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+async def trade_for_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    # Async session: the lookup no longer blocks the event loop
+    user = await _get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     await run_trading_for_user(user)
@@ -127,6 +141,9 @@ def get_users():
 @router.get("/")
 def read_root():
     return {"message": "Welcome to SentinelAI"}
+
+# The legacy blocks below rebind `router`; keep the unified one so it can still be mounted
+unified_router = router
 # app/routes.py
 
 from fastapi import APIRouter
@@ -177,3 +194,6 @@ router.include_router(auth_router, prefix="/auth", tags=["auth"])
 
 # Include bot routes
 router.include_router(bot_router, prefix="/api/bot", tags=["bot"])
+
+# Mount the unified routes (/bot/start, /bot/stop, /me, ...) on the router main.py includes
+router.include_router(unified_router)
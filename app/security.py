@@ -1,9 +1,15 @@
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import inspect
 from . import models
-from .database import get_db
-from sqlalchemy.orm import Session
+from .config import TOKEN_CACHE_MAX_TTL, TOKEN_CACHE_SIZE
+from .database import SessionLocal, fake_users_db
 
 # JWT settings
 SECRET_KEY = "your-secret-key"
@@ -11,7 +17,139 @@ ALGORITHM = "HS256"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+
+class CachedUser:
+    """
+    Immutable snapshot of a user's column values, shared by every request
+    carrying a cached token. Attributes read like the ORM User's.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values):
+        object.__setattr__(self, "_values", MappingProxyType(dict(values)))
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CachedUser records are immutable")
+
+    def __repr__(self):
+        return f"CachedUser(id={self._values.get('id')!r})"
+
+    def as_dict(self, exclude=("password", "hashed_password", "metaapi_token")):
+        return {key: value for key, value in self._values.items() if key not in exclude}
+
+    @classmethod
+    def from_user(cls, user):
+        return cls({attr.key: getattr(user, attr.key) for attr in inspect(user).mapper.column_attrs})
+
+
+class TokenCache:
+    """
+    LRU map of verified token -> CachedUser.
+
+    An entry expires with the token's `exp` claim (capped at `max_ttl`) and
+    is indexed by user id and subject so password and bot state changes can
+    drop every token of that user. Thread-safe, since sync dependencies run
+    in the threadpool.
+    """
+
+    def __init__(self, max_entries=TOKEN_CACHE_SIZE, max_ttl=TOKEN_CACHE_MAX_TTL, clock=time.time):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # token -> (expires_at, owner keys, user)
+        self._owners = {}  # ("id", user_id) / ("sub", subject) -> set of tokens
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= self._clock():
+                self._remove(token)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, token, user, user_id=None, subject=None, exp=None):
+        expires_at = self._clock() + self.max_ttl
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        owners = tuple(key for key in (("id", user_id), ("sub", subject)) if key[1] is not None)
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (expires_at, owners, user)
+            for key in owners:
+                self._owners.setdefault(key, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, user_id=None, subject=None) -> int:
+        """Drop every cached token of a user, by id and/or JWT subject."""
+        with self._lock:
+            tokens = set()
+            for key in (("id", user_id), ("sub", subject)):
+                if key[1] is not None:
+                    tokens |= self._owners.get(key, set())
+            for token in tokens:
+                self._remove(token)
+            self.invalidations += len(tokens)
+            return len(tokens)
+
+    def _remove(self, token):
+        _, owners, _ = self._entries.pop(token)
+        for key in owners:
+            tokens = self._owners.get(key)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._owners[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._owners.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+# Shared cache used by get_current_user
+token_cache = TokenCache()
+
+def get_current_user(token: str = Depends(oauth2_scheme)):
+    # Common case: a token verified earlier, served without decoding or a query
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -19,13 +157,27 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Tokens from the login routes carry `sub` (email, or username for the in-memory users)
         user_id: int = payload.get("user_id")
-        if user_id is None:
+        subject: str = payload.get("sub")
+        if user_id is None and subject is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    # Session only opened on a cache miss
+    db = SessionLocal()
+    try:
+        match = models.User.id == user_id if user_id is not None else models.User.email == subject
+        user = db.query(models.User).filter(match).first()
+        if user is not None:
+            user_id = user.id
+            user = CachedUser.from_user(user)
+    finally:
+        db.close()
+    if user is None and user_id is None and subject in fake_users_db:
+        user = CachedUser(fake_users_db[subject])
     if user is None:
         raise credentials_exception
+    token_cache.put(token, user, user_id=user_id, subject=subject, exp=payload.get("exp"))
     return user
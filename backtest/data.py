@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from strategy.patterns import OHLCV
+
+
+def load_candles(path: str) -> dict:
+    """
+    Load OHLCV history from a CSV or Parquet file into float64 numpy columns
+    ('time' as epoch seconds). Column names are matched case-insensitively and
+    'tickVolume' is accepted for volume. Parquet needs pyarrow or fastparquet.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.parquet', '.pq'):
+        df = pd.read_parquet(path)
+    elif ext in ('.csv', '.txt'):
+        df = pd.read_csv(path)
+    else:
+        raise ValueError(f"Unsupported candle file type: {path}")
+
+    columns = {name.lower(): name for name in df.columns}
+    if 'volume' not in columns and 'tickvolume' in columns:
+        columns['volume'] = columns['tickvolume']
+    missing = [field for field in ('time',) + OHLCV if field not in columns]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {missing}")
+
+    times = df[columns['time']]
+    if pd.api.types.is_numeric_dtype(times):
+        epoch = times.to_numpy(dtype=np.float64)
+    else:
+        try:
+            parsed = pd.to_datetime(times, utc=True, format='ISO8601')
+        except ValueError:
+            parsed = pd.to_datetime(times, utc=True)
+        epoch = parsed.to_numpy(dtype='datetime64[ns]').astype(np.int64) / 1e9
+
+    candles = {'time': epoch}
+    for field in OHLCV:
+        candles[field] = df[columns[field]].to_numpy(dtype=np.float64)
+    order = np.argsort(candles['time'], kind='stable')
+    if not np.all(order[:-1] < order[1:]):
+        candles = {field: column[order] for field, column in candles.items()}
+    return candles
+
+
+def symbol_from_path(path: str) -> str:
+    """EURUSD_1m.csv -> EURUSD"""
+    return os.path.basename(path).split('.')[0].split('_')[0].upper()
@@ -0,0 +1,170 @@
+"""
+Vectorized backtester for the strategy's candle-pattern logic.
+
+Signals for a whole history come from the stacked pattern kernel in one
+pass; trades enter at the next bar's open and SL/TP fills are found bar by
+bar with chunked numpy scans.
+
+    python -m backtest.engine data/EURUSD_1m.csv data/GBPUSD_1m.parquet ...
+"""
+import sys
+import time
+
+import numpy as np
+
+from backtest.data import load_candles, symbol_from_path
+from strategy.patterns import OHLCV, detect_patterns_stacked
+
+DEFAULT_PARAMS = {
+    'score_threshold': 3,  # should_trade cut
+    'pin_ratio': 2.0,      # detect_candle_patterns pin-bar wick ratio
+    'doji_ratio': 0.1,     # detect_candle_patterns doji body ratio
+    'sl_pips': 20,
+    'tp_pips': 40,
+    'spread_pips': 0.0,
+    'max_hold_bars': None,  # close at market after this many bars; None holds until SL/TP
+    'pip_size': None,       # price units per pip; None looks the symbol up in PIP_SIZES
+}
+
+# Metals and crypto quote far above FX rates; a 0.0001 pip would put SL/TP inside the entry bar
+PIP_SIZES = {
+    'XAU': 0.1,
+    'XAG': 0.01,
+    'BTC': 1.0,
+    'ETH': 0.1,
+}
+
+
+def pip_size(symbol: str) -> float:
+    for prefix, size in PIP_SIZES.items():
+        if symbol.upper().startswith(prefix):
+            return size
+    # FX: same convention as strategy.calculate_pips
+    return 0.01 if 'JPY' in symbol.upper() else 0.0001
+
+
+def signal_arrays(candles: dict, params: dict):
+    """Vectorized analyze_candles + should_trade over a full history: (score, direction, tradeable)."""
+    stacked = np.stack([candles[field] for field in OHLCV], axis=-1)[None]
+    flags = detect_patterns_stacked(stacked, pin_ratio=params['pin_ratio'], doji_ratio=params['doji_ratio'])
+    bullish, bearish = flags['bullish_engulfing'][0], flags['bearish_engulfing'][0]
+    score = 3 * bullish + 2 * flags['pin_bar'][0]
+    direction = np.where(bullish, 1, np.where(bearish, -1, 0))  # 1 buy, -1 sell, 0 hold
+    tradeable = (score >= params['score_threshold']) & (direction != 0)
+    return score, direction, tradeable
+
+
+def _first_hit(high, low, start, end, sl, tp, side):
+    """Index of the first bar in [start, end) touching SL or TP and the exit price; SL wins same-bar ties."""
+    chunk = 256
+    pos = start
+    while pos < end:
+        stop = min(pos + chunk, end)
+        h, l = high[pos:stop], low[pos:stop]
+        if side > 0:
+            sl_hit, tp_hit = l <= sl, h >= tp
+        else:
+            sl_hit, tp_hit = h >= sl, l <= tp
+        hit = sl_hit | tp_hit
+        if hit.any():
+            i = int(np.argmax(hit))
+            return pos + i, (sl if sl_hit[i] else tp)
+        pos = stop
+        chunk *= 2
+    return None, None
+
+
+def simulate(candles: dict, symbol: str, params=None) -> dict:
+    """Run one symbol's history; returns per-trade arrays and summary stats (P&L in pips)."""
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    open_, high, low, close = candles['open'], candles['high'], candles['low'], candles['close']
+    n = len(close)
+    pip = params['pip_size'] or pip_size(symbol)
+    _, direction, tradeable = signal_arrays(candles, params)
+
+    signals = np.flatnonzero(tradeable[:-1])  # need a next bar to enter on
+    max_hold = params['max_hold_bars']
+    if max_hold is not None and max_hold < 1:
+        raise ValueError(f"max_hold_bars must be >= 1 or None, got {max_hold}")
+    entries, exits, sides, pnl = [], [], [], []
+
+    k = 0
+    while k < len(signals):
+        signal_bar = signals[k]
+        entry_bar = signal_bar + 1
+        side = int(direction[signal_bar])
+        spread = params['spread_pips'] * pip
+        entry = open_[entry_bar] + (spread if side > 0 else -spread)
+        sl = entry - side * params['sl_pips'] * pip
+        tp = entry + side * params['tp_pips'] * pip
+
+        end = n if max_hold is None else min(n, entry_bar + max_hold)
+        exit_bar, exit_price = _first_hit(high, low, entry_bar, end, sl, tp, side)
+        if exit_bar is None:
+            exit_bar = end - 1
+            exit_price = close[exit_bar]
+
+        entries.append(entry_bar)
+        exits.append(exit_bar)
+        sides.append(side)
+        pnl.append(side * (exit_price - entry) / pip)
+
+        # One position per symbol: the next trade may only come from a signal at or after the exit bar
+        k = int(np.searchsorted(signals, exit_bar, side='left'))
+
+    trades = {
+        'entry_bar': np.asarray(entries, dtype=np.int64),
+        'exit_bar': np.asarray(exits, dtype=np.int64),
+        'side': np.asarray(sides, dtype=np.int8),
+        'pnl_pips': np.asarray(pnl, dtype=np.float64),
+    }
+    trades['entry_time'] = candles['time'][trades['entry_bar']]
+    trades['exit_time'] = candles['time'][trades['exit_bar']]
+    return {'symbol': symbol, 'bars': n, 'trades': trades, 'stats': trade_stats(trades['pnl_pips'])}
+
+
+def trade_stats(pnl: np.ndarray) -> dict:
+    if not len(pnl):
+        return {'trades': 0, 'win_rate': 0.0, 'total_pips': 0.0, 'avg_pips': 0.0,
+                'profit_factor': 0.0, 'max_drawdown_pips': 0.0}
+    equity = np.cumsum(pnl)
+    drawdown = np.maximum.accumulate(np.maximum(equity, 0.0)) - equity
+    gross_win = pnl[pnl > 0].sum()
+    gross_loss = -pnl[pnl < 0].sum()
+    return {
+        'trades': int(len(pnl)),
+        'win_rate': float((pnl > 0).mean()),
+        'total_pips': float(equity[-1]),
+        'avg_pips': float(pnl.mean()),
+        'profit_factor': float(gross_win / gross_loss) if gross_loss else (float('inf') if gross_win else 0.0),
+        'max_drawdown_pips': float(drawdown.max()),
+    }
+
+
+def backtest_files(paths, params=None) -> dict:
+    """Backtest every file (symbol taken from the file name) and add a combined portfolio summary."""
+    results = {}
+    for path in paths:
+        symbol = symbol_from_path(path)
+        results[symbol] = simulate(load_candles(path), symbol, params)
+
+    # Portfolio: all trades ordered by exit time
+    exit_times = np.concatenate([r['trades']['exit_time'] for r in results.values()] or [np.empty(0)])
+    pnl = np.concatenate([r['trades']['pnl_pips'] for r in results.values()] or [np.empty(0)])
+    results['PORTFOLIO'] = {'stats': trade_stats(pnl[np.argsort(exit_times, kind='stable')])}
+    return results
+
+
+def main(paths):
+    started = time.perf_counter()
+    results = backtest_files(paths)
+    for symbol, result in results.items():
+        stats = result['stats']
+        print(f"{symbol:10} trades={stats['trades']:6d} win={stats['win_rate']:.1%} "
+              f"pips={stats['total_pips']:10.1f} pf={stats['profit_factor']:.2f} "
+              f"maxDD={stats['max_drawdown_pips']:.1f}")
+    print(f"[BACKTEST] {len(paths)} file(s) in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,210 @@
+"""
+Grid / random search over strategy parameters on local candle history.
+
+Candle arrays are copied into shared memory once; worker processes attach
+to them instead of receiving pickled copies. Each parameter set is scored
+on walk-forward splits and ranked by its result on the largest (last)
+anchored train window; the windows overlap, so pooling them would count
+early history once per fold. For each
+fold the best set on that fold's train window is picked and only its result
+on the following test window is reported, so the out-of-sample figures never
+feed back into the choice.
+
+    python -m backtest.optimizer data/*.csv --search random --samples 200 --folds 4 --out results.csv
+"""
+import argparse
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest.data import load_candles, symbol_from_path
+from backtest.engine import simulate, trade_stats
+
+FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+# Hard-coded guesses in strategy.py and the values tried around them
+DEFAULT_GRID = {
+    'score_threshold': [2, 3, 4, 5],
+    'pin_ratio': [1.5, 2.0, 2.5, 3.0],
+    'sl_pips': [10, 20, 30],
+    'tp_pips': [20, 40, 60],
+}
+
+
+# === Shared memory ===
+class SharedCandles:
+    """Owns one shared-memory block per symbol holding its (fields × bars) float64 array."""
+
+    def __init__(self, candles_by_symbol: dict):
+        self._blocks = []
+        self.meta = []  # (symbol, block name, bars) sent to workers
+        for symbol, candles in candles_by_symbol.items():
+            bars = len(candles['close'])
+            block = shared_memory.SharedMemory(create=True, size=max(1, len(FIELDS) * bars * 8))
+            array = np.ndarray((len(FIELDS), bars), dtype=np.float64, buffer=block.buf)
+            for i, field in enumerate(FIELDS):
+                array[i] = candles[field]
+            self._blocks.append(block)
+            self.meta.append((symbol, block.name, bars))
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_worker_blocks = []
+_worker_candles = {}
+
+
+def _attach(meta):
+    """Worker initializer: map every symbol's block as zero-copy numpy columns."""
+    for symbol, name, bars in meta:
+        # Pool workers share the parent's resource tracker, and the parent unlinks the block
+        block = shared_memory.SharedMemory(name=name)
+        array = np.ndarray((len(FIELDS), bars), dtype=np.float64, buffer=block.buf)
+        _worker_blocks.append(block)
+        _worker_candles[symbol] = {field: array[i] for i, field in enumerate(FIELDS)}
+
+
+# === Search space and splits ===
+def grid_params(grid: dict):
+    keys = list(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        yield dict(zip(keys, values))
+
+
+def random_params(grid: dict, samples: int, seed=0):
+    combos = list(grid_params(grid))
+    rng = random.Random(seed)
+    return rng.sample(combos, min(samples, len(combos)))
+
+
+def walk_forward_splits(bars: int, folds: int, train_frac=0.7):
+    """
+    Anchored walk-forward: fold k trains on everything up to its test window
+    and tests on the next slice. Returns [(train_start, train_end, test_end)].
+    """
+    if folds <= 1:
+        cut = int(bars * train_frac)
+        return [(0, cut, bars)]
+    first_test = int(bars * train_frac)
+    step = (bars - first_test) // folds
+    return [(0, first_test + k * step, first_test + (k + 1) * step if k < folds - 1 else bars)
+            for k in range(folds)]
+
+
+# === Evaluation ===
+def _slice(candles, start, end):
+    return {field: column[start:end] for field, column in candles.items()}
+
+
+def _concat(arrays):
+    return np.concatenate(arrays) if arrays else np.empty(0)
+
+
+def evaluate(params: dict, folds: int, train_frac: float):
+    """
+    Score one parameter set on every symbol and fold (runs inside a worker).
+    Returns the in-sample summary row, taken from the last fold's train window
+    (it contains every earlier one), and per fold (train stats, test P&L).
+    """
+    splits = {symbol: walk_forward_splits(len(candles['close']), folds, train_frac)
+              for symbol, candles in _worker_candles.items()}
+    fold_count = max((len(s) for s in splits.values()), default=0)
+    train_pnl, test_pnl = [[] for _ in range(fold_count)], [[] for _ in range(fold_count)]
+    for symbol, candles in _worker_candles.items():
+        for k, (train_start, train_end, test_end) in enumerate(splits[symbol]):
+            train = simulate(_slice(candles, train_start, train_end), symbol, params)
+            test = simulate(_slice(candles, train_end, test_end), symbol, params)
+            train_pnl[k].append(train['trades']['pnl_pips'])
+            test_pnl[k].append(test['trades']['pnl_pips'])
+
+    train_pnl = [_concat(pnl) for pnl in train_pnl]
+    test_pnl = [_concat(pnl) for pnl in test_pnl]
+    row = dict(params)
+    for key, value in trade_stats(train_pnl[-1] if train_pnl else np.empty(0)).items():
+        row[f"train_{key}"] = value
+    return row, [(trade_stats(train), test) for train, test in zip(train_pnl, test_pnl)]
+
+
+def walk_forward_select(param_sets, fold_results, objective='total_pips'):
+    """
+    Per fold, pick the parameter set with the best train-window `objective`
+    (ties go to the set listed first) and report that set's test-window stats.
+    Returns the per-fold table and the combined out-of-sample stats.
+    """
+    rows, selected_pnl = [], []
+    for k in range(min((len(folds) for folds in fold_results), default=0)):
+        best = max(range(len(param_sets)), key=lambda i: (fold_results[i][k][0][objective], -i))
+        train_stats, test_pnl = fold_results[best][k]
+        row = {'fold': k, **param_sets[best], f"train_{objective}": train_stats[objective]}
+        for key, value in trade_stats(test_pnl).items():
+            row[f"test_{key}"] = value
+        rows.append(row)
+        selected_pnl.append(test_pnl)
+    return pd.DataFrame(rows), trade_stats(_concat(selected_pnl))
+
+
+def optimize(candles_by_symbol: dict, param_sets, folds=3, train_frac=0.7, workers=None, objective='total_pips'):
+    """
+    Evaluate every parameter set across a process pool. Returns the table
+    ranked by `objective` on the largest train window, the per-fold walk-forward selections, and
+    the out-of-sample stats of those selections combined.
+    """
+    param_sets = list(param_sets)
+    with SharedCandles(candles_by_symbol) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shared.meta,)) as pool:
+            chunksize = max(1, len(param_sets) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(pool.map(evaluate, param_sets, itertools.repeat(folds), itertools.repeat(train_frac),
+                                    chunksize=chunksize))
+    rows = [row for row, _ in results]
+    fold_results = [fold for _, fold in results]
+
+    table = pd.DataFrame(rows).sort_values(f"train_{objective}", ascending=False, kind='stable').reset_index(drop=True)
+    table.index.name = 'rank'
+
+    selections, out_of_sample = walk_forward_select(param_sets, fold_results, objective)
+    return table, selections, out_of_sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize strategy parameters on local candle files")
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--search', choices=('grid', 'random'), default='grid')
+    parser.add_argument('--samples', type=int, default=100)
+    parser.add_argument('--folds', type=int, default=3)
+    parser.add_argument('--train-frac', type=float, default=0.7)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--objective', default='total_pips', help="trade_stats key, measured on train windows")
+    parser.add_argument('--out', default='optimizer_results.csv')
+    args = parser.parse_args()
+
+    candles = {symbol_from_path(path): load_candles(path) for path in args.paths}
+    param_sets = grid_params(DEFAULT_GRID) if args.search == 'grid' else random_params(DEFAULT_GRID, args.samples)
+
+    started = time.perf_counter()
+    table, selections, out_of_sample = optimize(candles, param_sets, folds=args.folds, train_frac=args.train_frac,
+                                                workers=args.workers, objective=args.objective)
+    table.to_csv(args.out)
+    print(table.head(10).to_string())
+    print(selections.to_string(index=False))
+    print(f"[OPTIMIZER] Walk-forward out-of-sample: {out_of_sample}")
+    print(f"[OPTIMIZER] {len(table)} parameter set(s) in {time.perf_counter() - started:.1f}s → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare the per-symbol pandas pattern path with the stacked numpy kernel and
+the O(1)-per-bar incremental detector, checking all three agree bar by bar.
+
+    python -m benchmarks.bench_patterns [symbols] [bars] [repeats]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from strategy.patterns import PATTERNS, IncrementalPatternDetector, detect_patterns_stacked, stack_candles
+from strategy.strategy import detect_candle_patterns
+
+
+def random_candles(symbols, bars, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(symbols):
+        close = 1 + np.cumsum(rng.normal(0, 0.001, bars))
+        open_ = close + rng.normal(0, 0.0005, bars)
+        high = np.maximum(open_, close) + rng.exponential(0.0005, bars)
+        low = np.minimum(open_, close) - rng.exponential(0.0005, bars)
+        volume = rng.integers(100, 1000, bars).astype(float)
+        frames.append({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume})
+    return frames
+
+
+def run_incremental(frame):
+    detector = IncrementalPatternDetector()
+    o, h, l, c = frame['open'], frame['high'], frame['low'], frame['close']
+    return [detector.update(o[i], h[i], l[i], c[i]) for i in range(len(c))]
+
+
+def best_of(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(symbols=10, bars=50, repeats=20):
+    frames = random_candles(symbols, bars)
+    stacked = stack_candles(frames)
+
+    expected = [detect_candle_patterns(pd.DataFrame(frame)) for frame in frames]
+    flags = detect_patterns_stacked(stacked)
+    for name in PATTERNS:
+        for i, df in enumerate(expected):
+            assert np.array_equal(flags[name][i], df[name].to_numpy()), f"{name} mismatch on symbol {i}"
+    for i, frame in enumerate(frames):
+        streamed = run_incremental(frame)
+        for name in PATTERNS:
+            column = expected[i][name].to_numpy()
+            assert all(bool(bar[name]) == column[j] for j, bar in enumerate(streamed)), \
+                f"incremental {name} mismatch on symbol {i}"
+
+    pandas_time = best_of(lambda: [detect_candle_patterns(pd.DataFrame(frame)) for frame in frames], repeats)
+    kernel_time = best_of(lambda: detect_patterns_stacked(stacked), repeats)
+    detectors = [IncrementalPatternDetector() for _ in frames]
+    newest = [tuple(frame[field][-1] for field in ('open', 'high', 'low', 'close')) for frame in frames]
+    incremental_time = best_of(lambda: [d.update(*bar) for d, bar in zip(detectors, newest)], repeats)
+
+    print(f"symbols={symbols} bars={bars}")
+    print(f"pandas per-symbol : {pandas_time * 1000:9.3f} ms")
+    print(f"numpy stacked     : {kernel_time * 1000:9.3f} ms")
+    print(f"speedup           : {pandas_time / kernel_time:9.1f}x")
+    print(f"incremental (1 bar per symbol): {incremental_time * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,77 @@
+"""
+Throughput of the compiled lexicon scorer against the original
+check_news_sentiment substring rules.
+
+    python -m benchmarks.bench_sentiment [headlines] [repeats]
+"""
+import random
+import sys
+import time
+
+from news.lexicon import lexicon_scorer
+
+WORDS = (
+    "euro dollar yen gold bitcoin stocks markets traders investors central bank rates inflation "
+    "data report week outlook session ahead of amid after as on in"
+).split()
+SIGNALS = ("gains", "bullish", "falls", "bearish", "rally", "slumps", "surges", "plunges", "steady")
+
+
+def legacy_sentiment(title):
+    # The classification check_news_sentiment used to run per headline
+    return (
+        'positive' if 'gain' in title.lower() or 'bull' in title.lower()
+        else 'negative' if 'fall' in title.lower() or 'bear' in title.lower()
+        else 'neutral'
+    )
+
+
+# Headlines whose polarity the lexicon must get right, including words that merely start with a term
+SANITY_CASES = (
+    ("Mission to Mars", 'neutral'),
+    ("Fed beaten by markets", 'neutral'),
+    ("Yen bearing up ahead of BoJ", 'neutral'),
+    ("Dollar gains as yields rise", 'positive'),
+    ("Euro rallies, beats forecasts", 'positive'),
+    ("Gold falls in bearish session", 'negative'),
+    ("Sterling slumps after payrolls miss", 'negative'),
+    ("Bitcoin sell-off deepens", 'negative'),
+)
+
+
+def random_headlines(count, seed=0):
+    rng = random.Random(seed)
+    headlines = []
+    for _ in range(count):
+        words = rng.sample(WORDS, 8)
+        words.insert(rng.randrange(len(words)), rng.choice(SIGNALS))
+        headlines.append(" ".join(words).capitalize())
+    return headlines
+
+
+def best_of(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(count=10000, repeats=5):
+    for title, expected in SANITY_CASES:
+        polarity = lexicon_scorer.score(title).polarity
+        assert polarity == expected, f"{title!r}: expected {expected}, got {polarity}"
+
+    headlines = random_headlines(count)
+
+    legacy_time = best_of(lambda: [legacy_sentiment(title) for title in headlines], repeats)
+    single_time = best_of(lambda: [lexicon_scorer.score(title) for title in headlines], repeats)
+
+    print(f"headlines={count} lexicon terms={len(lexicon_scorer.weights)}")
+    for name, elapsed in (("legacy substrings", legacy_time), ("lexicon per headline", single_time)):
+        print(f"{name:22}: {elapsed * 1000:9.3f} ms  ({count / elapsed:,.0f} headlines/s)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
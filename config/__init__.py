@@ -4,3 +4,77 @@ from dotenv import load_dotenv
 load_dotenv()
 
 META_API_TOKEN = os.getenv("META_API_TOKEN")
+
+# === MetaApi client/account pool ===
+METAAPI_POOL_IDLE_TTL = float(os.getenv("METAAPI_POOL_IDLE_TTL", "900"))  # seconds unused before eviction
+METAAPI_POOL_HEALTH_INTERVAL = float(os.getenv("METAAPI_POOL_HEALTH_INTERVAL", "60"))  # seconds between account reloads
+
+# === Symbol scanning ===
+SYMBOL_SCAN_CONCURRENCY = int(os.getenv("SYMBOL_SCAN_CONCURRENCY", "10"))  # max in-flight analyses per user
+SYMBOL_SCAN_TIMEOUT = float(os.getenv("SYMBOL_SCAN_TIMEOUT", "10"))  # seconds per symbol before it is cancelled
+SNAPSHOT_RETRY_DELAY = float(os.getenv("SNAPSHOT_RETRY_DELAY", "30"))  # seconds before failed symbols are retried, doubled per retry within a bar
+
+# === Candle store ===
+CANDLE_STORE_CAPACITY = int(os.getenv("CANDLE_STORE_CAPACITY", "512"))  # minimum bars kept per symbol/timeframe; grows to the largest request
+BASE_TIMEFRAME = os.getenv("BASE_TIMEFRAME", "1h")  # only timeframe fetched per symbol; multiples of it are resampled locally
+SESSION_OFFSET = float(os.getenv("SESSION_OFFSET_HOURS", "0")) * 3600  # broker server time minus UTC; H4/D1 bars open on its midnight
+
+# === Engine scheduler ===
+ENGINE_TIMEFRAME = os.getenv("ENGINE_TIMEFRAME", "1h")  # cycles run once per bar of this timeframe
+SCHEDULER_CLOSE_DELAY = float(os.getenv("SCHEDULER_CLOSE_DELAY", "2"))  # seconds after bar close before waking
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "5"))  # max random extra delay per user, in seconds
+
+# === Sharded engine ===
+ENGINE_WORKERS = int(os.getenv("ENGINE_WORKERS", "0"))  # local worker processes; 0 runs a single unsharded engine
+SHARD_WORKER_ID = os.getenv("SHARD_WORKER_ID")  # defaults to <hostname>-<pid>
+SHARD_LEASE_TTL = float(os.getenv("SHARD_LEASE_TTL", "45"))  # seconds a worker lease stays valid without renewal
+SHARD_HEARTBEAT_INTERVAL = float(os.getenv("SHARD_HEARTBEAT_INTERVAL", "15"))  # seconds between lease renewals
+SHARD_VNODES = int(os.getenv("SHARD_VNODES", "64"))  # virtual nodes per worker on the hash ring
+SHARD_CLAIM_RETENTION = float(os.getenv("SHARD_CLAIM_RETENTION", "86400"))  # seconds (user, bar) claims are kept
+
+# === Symbols traded by the engine ===
+SYMBOLS = [
+    "EURUSD", "GBPUSD", "USDJPY", "USDCHF", "USDCAD",
+    "AUDUSD", "NZDUSD", "XAUUSD", "BTCUSD", "ETHUSD"
+]
+
+# === Streaming mode ===
+STREAM_EVENT_QUEUE_SIZE = int(os.getenv("STREAM_EVENT_QUEUE_SIZE", "10000"))  # tick events are dropped when full
+
+# === Quote cache ===
+QUOTE_MAX_AGE = float(os.getenv("QUOTE_MAX_AGE", "2"))  # seconds before a cached quote is refetched
+QUOTE_FEED_RETRY_DELAY = float(os.getenv("QUOTE_FEED_RETRY_DELAY", "60"))  # seconds before a failed quote stream is reopened
+QUOTE_FEED_STALE_AFTER = float(os.getenv("QUOTE_FEED_STALE_AFTER", "300"))  # seconds without a quote before a stream is reopened
+
+# === Order dispatcher ===
+ORDER_QUEUE_SIZE = int(os.getenv("ORDER_QUEUE_SIZE", "100"))  # pending orders per account before submit() waits
+ORDER_MAX_RETRIES = int(os.getenv("ORDER_MAX_RETRIES", "3"))  # retries of transient failures per order
+ORDER_RETRY_BASE_DELAY = float(os.getenv("ORDER_RETRY_BASE_DELAY", "0.5"))  # seconds, doubled on every retry
+ORDER_WORKER_IDLE_TIMEOUT = float(os.getenv("ORDER_WORKER_IDLE_TIMEOUT", "300"))  # seconds before an idle account worker exits
+
+# === Admission control ===
+ENGINE_MAX_CONCURRENT_USERS = int(os.getenv("ENGINE_MAX_CONCURRENT_USERS", "50"))  # user cycles running at once
+USER_CYCLE_DEADLINE = float(os.getenv("USER_CYCLE_DEADLINE", "60"))  # seconds before a user's cycle is cancelled
+
+# === News sentiment ===
+NEWS_API_KEY = os.getenv("NEWS_API_KEY", "YOUR_NEWS_API_KEY")
+NEWS_ENDPOINT = os.getenv("NEWS_ENDPOINT", "https://newsapi.org/v2/everything")
+NEWS_HTTP_TIMEOUT = float(os.getenv("NEWS_HTTP_TIMEOUT", "5"))  # seconds for the whole request
+NEWS_POOL_SIZE = int(os.getenv("NEWS_POOL_SIZE", "20"))  # max open connections to the news API
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "300"))  # seconds a sentiment result is reused
+NEWS_INGEST_INTERVAL = float(os.getenv("NEWS_INGEST_INTERVAL", "120"))  # seconds between bulk headline pulls
+NEWS_INGEST_PAGE_SIZE = int(os.getenv("NEWS_INGEST_PAGE_SIZE", "100"))  # headlines per page of a bulk pull
+NEWS_INGEST_MAX_PAGES = int(os.getenv("NEWS_INGEST_MAX_PAGES", "5"))  # pages per bulk pull; 1 on plans capped at 100 results
+NEWS_INGEST_OVERLAP = float(os.getenv("NEWS_INGEST_OVERLAP", "300"))  # seconds each pull re-reads before the last one
+NEWS_RETENTION_MINUTES = float(os.getenv("NEWS_RETENTION_MINUTES", "240"))  # headlines older than this are evicted
+NEWS_INGEST_QUERY = os.getenv(
+    "NEWS_INGEST_QUERY",
+    "forex OR currency OR dollar OR euro OR sterling OR yen OR franc OR gold OR bitcoin OR ethereum",
+)
+
+# === Candle archive ===
+CANDLE_ARCHIVE_DIR = os.getenv("CANDLE_ARCHIVE_DIR", "candle_archive")  # empty string disables the archive
+
+# === Active-user registry ===
+REGISTRY_RECONCILE_INTERVAL = float(os.getenv("REGISTRY_RECONCILE_INTERVAL", "300"))  # seconds between safety-net reloads from the database
+REGISTRY_CHANGE_RETENTION = float(os.getenv("REGISTRY_CHANGE_RETENTION", "86400"))  # seconds bot start/stop log rows are kept
@@ -1,59 +1,39 @@
-from metaapi_cloud_sdk import MetaApi
+import asyncio
+import random
+import time
+from config import (
+    ENGINE_MAX_CONCURRENT_USERS,
+    SYMBOLS,
+    USER_CYCLE_DEADLINE,
+)
+from market_data.streaming import quote_feeds
+from market_snapshot import market_stage
+from metaapi_connector import metaapi_pool
+from order_dispatcher import order_dispatcher
 from strategy.strategy import (
-    analyze_symbol,
     calculate_lot_size,
     calculate_pips,
     should_trade,
-    has_open_trades,
-    score_trade
+    has_open_trades
 )
 
-async def execute_trade(account, signal, symbol, lot_size, sl_pips, tp_pips):
-    try:
-        terminal = await account.get_terminal()
-        price = (await terminal.get_symbol_price(symbol)).bid
-
-        if signal == 'buy':
-            sl = price - sl_pips
-            tp = price + tp_pips
-        else:
-            sl = price + sl_pips
-            tp = price - tp_pips
-
-        print(f"[ORDER] Placing {signal.upper()} order on {symbol} at {price:.5f}")
-        result = await terminal.create_market_order(symbol, signal, lot_size, sl, tp)
-        print(f"[RESULT] ✅ Trade placed: {result}")
-    except Exception as e:
-        print(f"[ERROR] ❌ Trade execution failed: {e}")
+async def execute_trade(account, signal, symbol, lot_size, sl_pips, tp_pips, label=None):
+    """Hand the order to the account's dispatcher queue and return its client id without waiting for the fill."""
+    client_id = await order_dispatcher.submit(account, signal, symbol, lot_size, sl_pips, tp_pips, label=label)
+    print(f"[{label or account.id}][ORDER] Queued {signal.upper()} {symbol} as {client_id}")
+    return client_id
 
 async def run_trading_for_user(user):
-    metaapi = MetaApi(user.metaapi_token)  # Initialize here inside async function
-    account = await metaapi.metatrader_account_api.get_account(user.account_id)
+    # Reuse the pooled client/account; deploys and health checks happen inside the pool
+    metaapi, account = await metaapi_pool.get_account(user.metaapi_token, user.account_id, label=user.id)
+    # Keep the account's broker quotes streaming into the quote cache used for order pricing
+    quote_feeds.ensure(account, metaapi)
 
-    if account.state != 'DEPLOYED':
-        print(f"[{user.id}] Deploying account...")
-        await account.deploy()
-        await account.wait_connected()
-    else:
-        print(f"[{user.id}] Account already deployed.")
-
-    symbols = [
-        "EURUSD", "GBPUSD", "USDJPY", "USDCHF", "USDCAD",
-        "AUDUSD", "NZDUSD", "XAUUSD", "BTCUSD", "ETHUSD"
-    ]
-
-    best_score = -float('inf')
-    best_analysis = None
-    best_symbol = None
-
-    for symbol in symbols:
-        analysis = await analyze_symbol(metaapi, user.account_id, symbol)
-        score = score_trade(analysis)
-        print(f"[{user.id}][SCORE] {symbol} → {score:.2f}")
-        if score > best_score:
-            best_score = score
-            best_analysis = analysis
-            best_symbol = symbol
+    # Symbol analysis and scores are computed once per bar and shared; only filters and sizing are per user
+    snapshot = await market_stage.snapshot(metaapi, user.account_id)
+    best_symbol, best_analysis, best_score = snapshot.best(SYMBOLS)
+    if best_symbol is not None:
+        print(f"[{user.id}][BEST] {best_symbol} → {best_score:.2f}")
 
     if best_analysis and should_trade(best_analysis):
         open_trades = await has_open_trades(account, best_symbol)
@@ -69,7 +49,8 @@ async def run_trading_for_user(user):
                 symbol=best_symbol,
                 lot_size=lot_size,
                 sl_pips=sl_pips,
-                tp_pips=tp_pips
+                tp_pips=tp_pips,
+                label=user.id
             )
         else:
             print(f"[{user.id}][SKIP] Existing trade on {best_symbol}")
@@ -83,8 +64,111 @@ async def execution_engine():
 async def trade_execution(user):
     # Wrapper function to run trading logic for a user
     await run_trading_for_user(user)
-import asyncio
 
-async def run_trading_for_all_users(users):
-    tasks = [run_trading_for_user(user) for user in users]
-    await asyncio.gather(*tasks)
+class CycleReport:
+    """Outcome of one engine cycle: which users completed, timed out or failed."""
+
+    __slots__ = ("completed", "timed_out", "failed", "started_at", "duration")
+
+    def __init__(self):
+        self.completed = []
+        self.timed_out = []
+        self.failed = []
+        self.started_at = time.monotonic()
+        self.duration = 0.0
+
+    def summary(self):
+        return {
+            "completed": len(self.completed),
+            "timed_out": len(self.timed_out),
+            "failed": len(self.failed),
+            "duration": round(self.duration, 3),
+        }
+
+
+class UserCycleExecutor:
+    """
+    Worker pool for user cycles. At most `concurrency` cycles run at once
+    (shared by concurrent batches and direct run_one calls), each is
+    cancelled after `deadline` seconds, and the feeding queue is bounded so
+    producers wait instead of piling up tasks.
+    """
+
+    def __init__(self, concurrency=ENGINE_MAX_CONCURRENT_USERS, deadline=USER_CYCLE_DEADLINE, run_user=None):
+        self.concurrency = max(1, concurrency)
+        self.deadline = deadline
+        self.run_user = run_user or run_trading_for_user
+        self._slots = None
+
+    async def run_one(self, user, report=None):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        async with self._slots:
+            try:
+                await asyncio.wait_for(self.run_user(user), self.deadline)
+            except asyncio.TimeoutError:
+                print(f"[{user.id}][TIMEOUT] Cycle exceeded {self.deadline}s deadline and was cancelled")
+                if report is not None:
+                    report.timed_out.append(user.id)
+                return
+            except Exception as e:
+                print(f"[{user.id}][ERROR] Cycle failed: {e}")
+                if report is not None:
+                    report.failed.append(user.id)
+                return
+        if report is not None:
+            report.completed.append(user.id)
+
+    async def run_all(self, users, jitter=0.0, on_done=None) -> CycleReport:
+        """
+        Run every user through the pool. Start times are spread over up to
+        `jitter` seconds by delaying when each user is queued, so no worker
+        sits idle waiting. `on_done(user)` is called as each cycle finishes.
+        """
+        report = CycleReport()
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker():
+            while True:
+                user = await queue.get()
+                try:
+                    if user is None:
+                        return
+                    try:
+                        await self.run_one(user, report)
+                    finally:
+                        if on_done is not None:
+                            on_done(user)
+                finally:
+                    queue.task_done()
+
+        users = list(users)
+        offsets = sorted(random.uniform(0, jitter) for _ in users) if jitter > 0 else [0.0] * len(users)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            for user, offset in zip(users, offsets):
+                delay = started + offset - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await queue.put(user)  # backpressure: waits while all workers are busy
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+        report.duration = time.monotonic() - report.started_at
+        return report
+
+
+# Shared executor used by the engine and the scheduler
+user_executor = UserCycleExecutor()
+
+async def run_trading_for_all_users(users, jitter=0.0, on_done=None):
+    report = await user_executor.run_all(users, jitter=jitter, on_done=on_done)
+    metaapi_pool.evict_idle()
+    print(f"[ENGINE][CYCLE] {report.summary()}")
+    return report
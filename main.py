@@ -13,10 +13,18 @@ if PARENT_DIR not in sys.path:
     sys.path.append(PARENT_DIR)
 
 # === Local imports ===
-from app.database import engine, SessionLocal
+from app.database import dispose_async_engines, engine
 from app.models import Base, User  # Ensure models are registered before table creation
+from app.registry import active_users
 from app.routes import router as api_router  # Includes auth and bot routes
 from execution import run_trading_for_all_users  # Your trading logic
+from market_data.streaming import quote_feeds
+from metaapi_connector import metaapi_pool
+from news.client import news_client
+from news.ingest import news_ingester
+from scheduler import BarCloseScheduler
+from sharding import ShardCoordinator, run_worker_processes
+from config import ENGINE_WORKERS
 
 # === Create DB tables once ===
 Base.metadata.create_all(bind=engine)
@@ -33,6 +41,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("shutdown")
+async def close_database_pools():
+    await dispose_async_engines()
+
 # === Register all routes under /api ===
 app.include_router(api_router, prefix="/api")
 
@@ -41,26 +53,46 @@ app.include_router(api_router, prefix="/api")
 def root():
     return {"message": "🚀 Welcome to SentinelAI Bot API. Visit /api for endpoints."}
 
-# === Helper: Get all active users ===
-def get_all_active_users():
-    db = SessionLocal()
+# === Trading logic background task ===
+async def main(sharded=False, worker_id=None):
+    print("🟢 Trading Engine Starting...")
+    news_ingester.start()
+    # Active users come from the in-memory registry: no database reads per cycle
+    await active_users.start()
+    coordinator = None
+    if sharded:
+        # Users are split by a hash ring, and each (user, bar) is claimed through the lease table
+        coordinator = ShardCoordinator(worker_id) if worker_id else ShardCoordinator()
+        await coordinator.start()
+
+    scheduler = BarCloseScheduler(
+        get_users=active_users.users,
+        claim_users=coordinator.claim if coordinator is not None else None,
+        # Each tick is one bounded-queue batch through the executor, reported as a CycleReport
+        run_users=run_trading_for_all_users,
+        on_tick=metaapi_pool.evict_idle,
+        # Start/stop from the API process reaches this one through the change log
+        before_tick=active_users.sync_changes,
+    )
     try:
-        return db.query(User).filter(User.bot_active == True).all()
+        await scheduler.run_forever()
     finally:
-        db.close()
+        await news_ingester.stop()
+        await news_client.close()
+        await quote_feeds.stop()
+        await active_users.stop()
+        if coordinator is not None:
+            await coordinator.stop()
 
-# === Trading logic background task ===
-async def main():
-    print("🟢 Trading Engine Starting...")
-    users = get_all_active_users()
-    if users:
-        await run_trading_for_all_users(users)
-    else:
-        print("⚠️ No active users found. Trading Engine paused.")
+def run_sharded_engine(worker_id=None):
+    asyncio.run(main(sharded=True, worker_id=worker_id))
 
 # === Entry point for async trading when run directly ===
 if __name__ == "__main__":
-    asyncio.run(main())
+    if ENGINE_WORKERS > 0:
+        run_worker_processes(ENGINE_WORKERS, run_sharded_engine)
+    else:
+        asyncio.run(main())
 from fastapi.routing import APIRoute
 
 @app.get("/api/routes")
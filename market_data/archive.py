@@ -0,0 +1,160 @@
+import calendar
+import contextlib
+import os
+import tempfile
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from config import CANDLE_ARCHIVE_DIR
+
+FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+DAY = 24 * 60 * 60
+
+
+class CandleArchive:
+    """
+    On-disk candle archive partitioned by symbol / timeframe / day.
+
+    Each day is one .npy file holding a (field, bar) float64 array, so range
+    reads memory-map only the days they touch and get every column from the
+    same write. Appends rewrite just the day files they land in: each is
+    written under a unique temp name and renamed into place, and writers of a
+    series (e.g. sharded workers on one host) are serialized by a file lock.
+    """
+
+    def __init__(self, root=CANDLE_ARCHIVE_DIR):
+        self.root = root
+
+    def _series_dir(self, symbol, timeframe):
+        return os.path.join(self.root, symbol, timeframe)
+
+    def _day_path(self, symbol, timeframe, day):
+        name = time.strftime('%Y-%m-%d', time.gmtime(day * DAY)) + '.npy'
+        return os.path.join(self._series_dir(symbol, timeframe), name)
+
+    @contextlib.contextmanager
+    def _series_lock(self, symbol, timeframe):
+        path = self._series_dir(symbol, timeframe)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, '.lock'), 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def days(self, symbol, timeframe) -> list:
+        """Partition days (epoch days) present for a series, oldest first."""
+        path = self._series_dir(symbol, timeframe)
+        if not os.path.isdir(path):
+            return []
+        days = []
+        for name in os.listdir(path):
+            if not name.endswith('.npy'):
+                continue
+            try:
+                days.append(calendar.timegm(time.strptime(name[:-4], '%Y-%m-%d')) // DAY)
+            except ValueError:
+                continue
+        return sorted(days)
+
+    def _load_day(self, symbol, timeframe, day, mmap=True) -> dict:
+        block = np.load(self._day_path(symbol, timeframe, day), mmap_mode='r' if mmap else None)
+        # Rows of a C-ordered block are contiguous, so each column is a zero-copy view
+        return {field: block[i] for i, field in enumerate(FIELDS)}
+
+    def _write_day(self, symbol, timeframe, day, columns):
+        target = self._day_path(symbol, timeframe, day)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.stack([np.asarray(columns[field], dtype=np.float64) for field in FIELDS]))
+            os.replace(tmp, target)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp)
+            raise
+
+    def append(self, symbol: str, timeframe: str, columns: dict) -> int:
+        """
+        Append bars (column dict, time-ordered). Stored bars at or after the
+        first new bar of a day are replaced, so re-sent forming bars are updated.
+        """
+        times = np.asarray(columns['time'], dtype=np.float64)
+        if not len(times):
+            return 0
+        day_of = (times // DAY).astype(np.int64)
+        written = 0
+        with self._series_lock(symbol, timeframe):
+            for day in np.unique(day_of):
+                mask = day_of == day
+                new = {field: np.asarray(columns[field], dtype=np.float64)[mask] for field in FIELDS}
+                if os.path.exists(self._day_path(symbol, timeframe, day)):
+                    old = self._load_day(symbol, timeframe, day, mmap=False)
+                    keep = old['time'] < new['time'][0]
+                    new = {field: np.concatenate([old[field][keep], new[field]]) for field in FIELDS}
+                self._write_day(symbol, timeframe, int(day), new)
+                written += int(mask.sum())
+        return written
+
+    def read_range(self, symbol: str, timeframe: str, start: float, end: float) -> dict:
+        """
+        Bars with start <= time < end. Single-day ranges are zero-copy
+        memory-mapped slices; multi-day ranges are concatenated.
+        """
+        first, last = int(start // DAY), int((end - 1) // DAY)
+        parts = []
+        for day in self.days(symbol, timeframe):
+            if first <= day <= last:
+                columns = self._load_day(symbol, timeframe, day)
+                lo = int(np.searchsorted(columns['time'], start, side='left'))
+                hi = int(np.searchsorted(columns['time'], end, side='left'))
+                if hi > lo:
+                    parts.append({field: column[lo:hi] for field, column in columns.items()})
+        if not parts:
+            return {field: np.empty(0) for field in FIELDS}
+        if len(parts) == 1:
+            return parts[0]
+        return {field: np.concatenate([part[field] for part in parts]) for field in FIELDS}
+
+    def tail(self, symbol: str, timeframe: str, bars: int) -> dict:
+        """The newest `bars` bars, reading day partitions backwards only as far as needed."""
+        parts = []
+        remaining = bars
+        for day in reversed(self.days(symbol, timeframe)):
+            columns = self._load_day(symbol, timeframe, day)
+            take = min(remaining, len(columns['time']))
+            if take:
+                parts.append({field: column[-take:] for field, column in columns.items()})
+                remaining -= take
+            if remaining <= 0:
+                break
+        if not parts:
+            return {field: np.empty(0) for field in FIELDS}
+        return {field: np.concatenate([part[field] for part in reversed(parts)]) for field in FIELDS}
+
+    def last_time(self, symbol: str, timeframe: str):
+        days = self.days(symbol, timeframe)
+        if not days:
+            return None
+        times = self._load_day(symbol, timeframe, days[-1])['time']
+        return float(times[-1]) if len(times) else None
+
+
+# Shared archive used by the candle store; None when disabled
+candle_archive = CandleArchive() if CANDLE_ARCHIVE_DIR else None
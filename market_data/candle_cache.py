@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import numpy as np
+
+from market_data.candle_store import candle_store
+from market_data.resample import timeframe_resampler
+from market_data.timeframes import last_closed_bar_open, next_bar_close, timeframe_seconds
+
+
+class CandleCache:
+    """
+    Process-wide candle cache shared by all users.
+
+    Entries are keyed by (symbol, timeframe, last closed bar, bars) and expire
+    when the forming bar closes. Concurrent misses for the same key share a
+    single in-flight fetch. Values are zero-copy column views from the
+    incremental candle store, ending with the newest closed bar: the store
+    also returns the forming bar, which is trimmed so polling scores the same
+    bar as the streaming feed. Multiples of the base timeframe are resampled
+    from it instead of fetched, and expire with the base bar.
+    """
+
+    def __init__(self, store=candle_store, resampler=timeframe_resampler, clock=time.time):
+        self._store = store
+        self._resampler = resampler
+        self._clock = clock
+        self._entries = {}  # key -> (expires_at, candles)
+        self._inflight = {}  # key -> asyncio.Task
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_candles(self, metaapi, account_id, symbol: str, timeframe: str = '1h', bars: int = 50):
+        now = self._clock()
+        key = (symbol, timeframe, last_closed_bar_open(self._source_timeframe(timeframe), now), bars)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            self._purge(now)
+            task = asyncio.ensure_future(self._fetch(metaapi, account_id, key, now))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _, key=key: self._inflight.pop(key, None))
+
+        # Shield so one caller timing out does not cancel the fetch for everyone else
+        return await asyncio.shield(task)
+
+    def _source_timeframe(self, timeframe: str) -> str:
+        """Timeframe actually fetched to serve `timeframe`."""
+        if self._resampler is not None and self._resampler.supports(timeframe):
+            return self._resampler.base_timeframe
+        return timeframe
+
+    async def _fetch(self, metaapi, account_id, key, now):
+        symbol, timeframe, _, bars = key
+        source = self._source_timeframe(timeframe)
+        # One extra bar: the newest one may still be forming and is trimmed below
+        if source == timeframe:
+            candles = await self._store.refresh(metaapi, account_id, symbol, timeframe=timeframe, bars=bars + 1)
+        else:
+            await self._store.refresh(metaapi, account_id, symbol, timeframe=source,
+                                      bars=self._resampler.base_bars(timeframe, bars + 1))
+            candles = self._resampler.update(symbol, timeframe, bars + 1)
+        candles = closed_bars(candles, timeframe, now, bars)
+        self._entries[key] = (next_bar_close(source, now), candles)
+        return candles
+
+    def _purge(self, now):
+        for key, (expires_at, _) in list(self._entries.items()):
+            if expires_at <= now:
+                del self._entries[key]
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = self.coalesced = 0
+
+
+def closed_bars(candles: dict, timeframe: str, now: float, bars: int) -> dict:
+    """Zero-copy views over the newest `bars` rows that had closed by `now`."""
+    end = int(np.searchsorted(candles['time'], now - timeframe_seconds(timeframe), side='right'))
+    start = max(0, end - bars)
+    return {field: column[start:end] for field, column in candles.items()}
+
+
+# Shared cache used by strategy.analyze_symbol
+candle_cache = CandleCache()
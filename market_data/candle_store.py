@@ -0,0 +1,166 @@
+import asyncio
+import time
+
+import numpy as np
+
+from config import CANDLE_STORE_CAPACITY
+from market_data.archive import FIELDS, candle_archive
+from market_data.timeframes import timeframe_seconds, to_datetime, to_epoch
+
+
+class CandleRingBuffer:
+    """
+    Fixed-capacity columnar ring buffer of OHLCV bars.
+
+    Every bar is written twice (at i and i + capacity), so the newest n bars
+    are always one contiguous slice and view() never has to copy. A view
+    stays valid for (capacity - n) further appends.
+    """
+
+    def __init__(self, capacity: int = CANDLE_STORE_CAPACITY):
+        self.capacity = capacity
+        self._columns = {field: np.zeros(2 * capacity, dtype=np.float64) for field in FIELDS}
+        self._pos = 0  # next write slot in [0, capacity)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def first_time(self):
+        if not self.size:
+            return None
+        return self._columns['time'][self._pos + self.capacity - self.size]
+
+    @property
+    def last_time(self):
+        if not self.size:
+            return None
+        return self._columns['time'][self._pos - 1 + self.capacity]
+
+    def _write(self, slot, row):
+        for field in FIELDS:
+            column = self._columns[field]
+            column[slot] = column[slot + self.capacity] = row[field]
+
+    def append(self, row: dict) -> bool:
+        """Append a bar, or overwrite the newest one if it has the same time. Older bars are ignored."""
+        last = self.last_time
+        if last is not None:
+            if row['time'] < last:
+                return False
+            if row['time'] == last:
+                self._write((self._pos - 1) % self.capacity, row)
+                return True
+        self._write(self._pos, row)
+        self._pos = (self._pos + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return True
+
+    def extend(self, candles) -> int:
+        added = 0
+        for candle in candles:
+            added += self.append(_candle_row(candle))
+        return added
+
+    def extend_columns(self, columns: dict) -> int:
+        added = 0
+        for i in range(len(columns['time'])):
+            added += self.append({field: columns[field][i] for field in FIELDS})
+        return added
+
+    def view(self, n: int = None) -> dict:
+        """Zero-copy dict of column views over the newest n bars (oldest first)."""
+        n = self.size if n is None else min(n, self.size)
+        end = self._pos + self.capacity
+        return {field: column[end - n:end] for field, column in self._columns.items()}
+
+
+def _candle_row(candle) -> dict:
+    return {
+        'time': to_epoch(candle['time']),
+        'open': candle['open'],
+        'high': candle['high'],
+        'low': candle['low'],
+        'close': candle['close'],
+        'volume': candle.get('volume', candle.get('tickVolume', 0)) or 0,
+    }
+
+
+class CandleStore:
+    """
+    Per-(symbol, timeframe) ring buffers that only fetch bars newer than the
+    last stored one, unless a request reaches further back than the buffer,
+    in which case the whole window is fetched once. Buffers grow to the
+    largest request. With an archive, empty buffers warm-start from disk and
+    fetched bars are appended to it.
+    """
+
+    def __init__(self, capacity: int = CANDLE_STORE_CAPACITY, archive=candle_archive, clock=time.time):
+        self.capacity = capacity
+        self.archive = archive
+        self._clock = clock
+        self._buffers = {}
+        self._locks = {}
+        self._history_start = {}  # key -> earliest start ever requested from the API
+        self.bars_fetched = 0
+
+    def buffer(self, symbol: str, timeframe: str, capacity: int = 0) -> CandleRingBuffer:
+        key = (symbol, timeframe)
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = self._buffers[key] = CandleRingBuffer(max(self.capacity, capacity))
+            self._locks[key] = asyncio.Lock()
+        elif capacity > buf.capacity:
+            # Views over the old buffer stay valid; new bars go to the larger one
+            grown = CandleRingBuffer(capacity)
+            grown.extend_columns(buf.view())
+            buf = self._buffers[key] = grown
+        return buf
+
+    async def refresh(self, metaapi, account_id, symbol: str, timeframe: str = '1h', bars: int = 50) -> dict:
+        """Bring the buffer up to date and return a view over the newest `bars` bars."""
+        key = (symbol, timeframe)
+        self.buffer(symbol, timeframe)
+        async with self._locks[key]:
+            buf = self.buffer(symbol, timeframe, capacity=bars)
+            step = timeframe_seconds(timeframe)
+            window_start = self._clock() - bars * step
+            if not buf.size and self.archive is not None:
+                await asyncio.to_thread(self._warm_start, buf, symbol, timeframe, window_start)
+            # Bars are aligned to the timeframe, so the oldest one may start up to one bar after window_start
+            backfill = (buf.size and buf.first_time - window_start >= step
+                        and self._history_start.get(key, float('inf')) > window_start)
+            if buf.size and not backfill:
+                # Re-request the newest stored bar too, in case it was still forming
+                start = buf.last_time
+            else:
+                # Cold or too shallow for this request: fetch the whole window once
+                start = window_start
+                self._history_start[key] = window_start
+            candles = await metaapi.history_api.get_candles(
+                account_id, symbol, timeframe=timeframe, start=to_datetime(start)
+            )
+            self.bars_fetched += len(candles or [])
+            if backfill and candles:
+                # Bars older than the buffer cannot be appended, so rebuild it from the fetched window
+                buf = self._buffers[key] = CandleRingBuffer(buf.capacity)
+            if candles:
+                rows = [_candle_row(candle) for candle in candles]
+                for row in rows:
+                    buf.append(row)
+                if self.archive is not None:
+                    columns = {field: np.array([row[field] for row in rows], dtype=np.float64) for field in FIELDS}
+                    await asyncio.to_thread(self.archive.append, symbol, timeframe, columns)
+        return buf.view(bars)
+
+    def _warm_start(self, buf, symbol, timeframe, window_start):
+        """Load the archived tail into an empty buffer if it reaches into the requested window."""
+        last_time = self.archive.last_time(symbol, timeframe)
+        if last_time is None or last_time < window_start:
+            return
+        buf.extend_columns(self.archive.read_range(symbol, timeframe, window_start, last_time + 1))
+
+
+# Shared store used by the candle cache
+candle_store = CandleStore()
@@ -0,0 +1,70 @@
+import time
+
+from config import QUOTE_MAX_AGE
+
+
+class Quote:
+    __slots__ = ("source", "symbol", "bid", "ask", "received_at")
+
+    def __init__(self, source, symbol, bid, ask, received_at):
+        self.source = source
+        self.symbol = symbol
+        self.bid = bid
+        self.ask = ask
+        self.received_at = received_at
+
+
+def _field(price, name):
+    if isinstance(price, dict):
+        return price.get(name)
+    return getattr(price, name, None)
+
+
+def quote_source(account):
+    """Cache key prefix for an account's prices: its broker server, else the account itself."""
+    return getattr(account, 'server', None) or account.id
+
+
+class QuoteCache:
+    """
+    Latest bid/ask per (source, symbol), fed by market-data subscriptions.
+    The source is the broker server (see quote_source), since the same symbol
+    is priced differently across brokers. Quotes older than `max_age` seconds
+    are treated as stale and refetched.
+    """
+
+    def __init__(self, max_age=QUOTE_MAX_AGE, clock=time.monotonic):
+        self.max_age = max_age
+        self._clock = clock
+        self._quotes = {}
+        self.hits = 0
+        self.stale = 0
+
+    def update(self, source, symbol, price):
+        quote = Quote(source, symbol, _field(price, 'bid'), _field(price, 'ask'), self._clock())
+        self._quotes[(source, symbol)] = quote
+        return quote
+
+    def get(self, source, symbol, max_age=None):
+        """Return the cached quote if it is fresh enough, otherwise None."""
+        quote = self._quotes.get((source, symbol))
+        max_age = self.max_age if max_age is None else max_age
+        if quote is None or self._clock() - quote.received_at > max_age:
+            return None
+        return quote
+
+    async def get_or_fetch(self, source, symbol, fetch, max_age=None):
+        """Return a fresh quote, awaiting `fetch(symbol)` only when the cached one is stale."""
+        quote = self.get(source, symbol, max_age)
+        if quote is not None:
+            self.hits += 1
+            return quote
+        self.stale += 1
+        return self.update(source, symbol, await fetch(symbol))
+
+    def stats(self):
+        return {"quotes": len(self._quotes), "hits": self.hits, "stale": self.stale}
+
+
+# Shared cache used for order pricing
+quote_cache = QuoteCache()
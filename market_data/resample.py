@@ -0,0 +1,95 @@
+import numpy as np
+
+from config import BASE_TIMEFRAME, CANDLE_STORE_CAPACITY, SESSION_OFFSET
+from market_data.candle_store import FIELDS, CandleRingBuffer, candle_store
+from market_data.timeframes import bar_open, timeframe_seconds
+
+
+def resample_columns(columns: dict, timeframe: str, offset: float = SESSION_OFFSET) -> dict:
+    """
+    Aggregate time-sorted OHLCV columns into `timeframe` bars aligned to
+    multiples of the bar length in broker server time (UTC + `offset`
+    seconds). The last bar may still be forming.
+    """
+    times = np.asarray(columns['time'], dtype=np.float64)
+    if not len(times):
+        return {field: np.empty(0) for field in FIELDS}
+    step = timeframe_seconds(timeframe)
+    buckets = bar_open(times, step, offset)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:] - 1, len(times) - 1]
+    return {
+        'time': buckets[starts],
+        'open': np.asarray(columns['open'], dtype=np.float64)[starts],
+        'high': np.maximum.reduceat(np.asarray(columns['high'], dtype=np.float64), starts),
+        'low': np.minimum.reduceat(np.asarray(columns['low'], dtype=np.float64), starts),
+        'close': np.asarray(columns['close'], dtype=np.float64)[ends],
+        'volume': np.add.reduceat(np.asarray(columns['volume'], dtype=np.float64), starts),
+    }
+
+
+class TimeframeResampler:
+    """
+    Builds higher timeframes from the base timeframe buffers of the candle
+    store, so only the base timeframe is ever fetched.
+
+    Each (symbol, timeframe) keeps its own ring buffer. update() only
+    re-aggregates the base bars from the newest stored higher-timeframe bar
+    onwards, so the cost per call is the number of new base bars. It is
+    rebuilt from scratch when the base buffer was backfilled further back
+    than the bars it holds.
+    """
+
+    def __init__(self, store=candle_store, base_timeframe: str = BASE_TIMEFRAME, capacity: int = CANDLE_STORE_CAPACITY,
+                 offset: float = SESSION_OFFSET):
+        self.store = store
+        self.base_timeframe = base_timeframe
+        self.capacity = capacity
+        self.offset = offset
+        self._buffers = {}
+
+    def supports(self, timeframe: str) -> bool:
+        """True if `timeframe` is a strict multiple of the base timeframe."""
+        step, base = timeframe_seconds(timeframe), timeframe_seconds(self.base_timeframe)
+        return step > base and step % base == 0
+
+    def base_bars(self, timeframe: str, bars: int) -> int:
+        """Base bars needed to build `bars` bars of `timeframe`; one extra bar covers a partial first bucket."""
+        ratio = timeframe_seconds(timeframe) // timeframe_seconds(self.base_timeframe)
+        return (bars + 1) * ratio
+
+    def update(self, symbol: str, timeframe: str, bars: int = 50) -> dict:
+        """Fold new base bars into `timeframe` and return a view over its newest `bars` bars."""
+        if not self.supports(timeframe):
+            raise ValueError(f"Cannot build {timeframe} from {self.base_timeframe} bars")
+        if bars > self.capacity:
+            raise ValueError(f"Requested {bars} {timeframe} bars but resampler capacity is {self.capacity}")
+        base = self.store.buffer(symbol, self.base_timeframe).view()
+        times = base['time']
+        step = timeframe_seconds(timeframe)
+
+        buf = self._buffers.get((symbol, timeframe))
+        first_bucket = bar_open(times[0], step, self.offset) if len(times) else None
+        if first_bucket is not None and first_bucket < times[0]:
+            first_bucket += step
+        if buf is None or (first_bucket is not None and buf.size and first_bucket < buf.first_time):
+            # First complete bucket of the base bars is older than what is held: rebuild
+            buf = self._buffers[(symbol, timeframe)] = CandleRingBuffer(self.capacity)
+
+        if len(times):
+            if buf.last_time is not None:
+                # Rebuild the newest stored bar too, it may have been forming
+                start = int(np.searchsorted(times, buf.last_time, side='left'))
+                newest = {field: column[start:] for field, column in base.items()}
+                resampled = resample_columns(newest, timeframe, self.offset)
+            else:
+                resampled = resample_columns(base, timeframe, self.offset)
+                if resampled['time'][0] < times[0]:
+                    # The oldest base bars of the first bucket are no longer held, so it is incomplete
+                    resampled = {field: column[1:] for field, column in resampled.items()}
+            buf.extend_columns(resampled)
+        return buf.view(bars)
+
+
+# Shared resampler used by the candle cache
+timeframe_resampler = TimeframeResampler()
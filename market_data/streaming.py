@@ -0,0 +1,238 @@
+import asyncio
+import time
+
+from metaapi_cloud_sdk import SynchronizationListener
+
+from config import ENGINE_TIMEFRAME, QUOTE_FEED_RETRY_DELAY, QUOTE_FEED_STALE_AFTER, STREAM_EVENT_QUEUE_SIZE, SYMBOLS
+from market_data.candle_store import candle_store, _candle_row
+from market_data.quote_cache import quote_cache, quote_source
+from metaapi_connector import metaapi_pool
+
+
+class MarketDataListener(SynchronizationListener):
+    """Forwards price and candle updates from a streaming connection to its feed."""
+
+    def __init__(self, feed):
+        super().__init__()
+        self.feed = feed
+
+    async def on_symbol_price_updated(self, instance_index, price):
+        self.feed.handle_price(price)
+
+    async def on_candles_updated(self, instance_index, candles, *args, **kwargs):
+        self.feed.handle_candles(candles)
+
+
+class StreamingMarketFeed:
+    """
+    Tick/bar event feed built on a MetaApi streaming connection.
+
+    Subscribes once per symbol to quotes and (unless `candles` is False)
+    `timeframe` candles, writes bars into the shared candle store, keeps the
+    shared quote cache current under the connection's quote source and turns
+    updates into events:
+    bar-close handlers get (symbol, view) as soon as a newer bar arrives,
+    tick handlers get (symbol, price) for every quote.
+    """
+
+    def __init__(self, connection, symbols, timeframe='1h', bars=50, store=candle_store,
+                 queue_size=STREAM_EVENT_QUEUE_SIZE, candles=True, source=None):
+        self.connection = connection
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.bars = bars
+        self.candles = candles
+        self.source = source or quote_source(connection.account)
+        self.store = store
+        self.prices = {}
+        self._subscribed = set()
+        self._bar_handlers = []
+        self._tick_handlers = []
+        self.queue_size = queue_size
+        self._queue = asyncio.Queue()
+        self._listener = MarketDataListener(self)
+        self._consumer = None
+        self.dropped_ticks = 0
+        self.started_at = None
+        self.last_price_at = None  # time.monotonic() of the latest quote
+
+    def on_bar_close(self, handler):
+        self._bar_handlers.append(handler)
+        return handler
+
+    def on_tick(self, handler):
+        self._tick_handlers.append(handler)
+        return handler
+
+    async def start(self):
+        self.connection.add_synchronization_listener(self._listener)
+        self.started_at = time.monotonic()
+        self._consumer = asyncio.create_task(self._consume())
+        for symbol in self.symbols:
+            await self.subscribe(symbol)
+
+    async def subscribe(self, symbol: str):
+        if symbol in self._subscribed:
+            return
+        subscriptions = [{'type': 'quotes'}]
+        if self.candles:
+            subscriptions.append({'type': 'candles', 'timeframe': self.timeframe})
+        await self.connection.subscribe_to_market_data(symbol, subscriptions)
+        self._subscribed.add(symbol)
+        print(f"[STREAM] Subscribed to {symbol} ({self.timeframe if self.candles else 'quotes'}) on {self.source}")
+
+    async def stop(self):
+        self.connection.remove_synchronization_listener(self._listener)
+        if self._consumer is not None:
+            self._consumer.cancel()
+            await asyncio.gather(self._consumer, return_exceptions=True)
+
+    def handle_price(self, price):
+        symbol = price.get('symbol')
+        if symbol not in self._subscribed:
+            return
+        self.prices[symbol] = price
+        self.last_price_at = time.monotonic()
+        quote_cache.update(self.source, symbol, price)
+        if not self._tick_handlers:
+            return
+        if self._queue.qsize() >= self.queue_size:
+            # The latest price is still in self.prices; only the event is lost
+            self.dropped_ticks += 1
+            return
+        self._queue.put_nowait(('tick', symbol, price))
+
+    def handle_candles(self, candles):
+        if not self.candles:
+            return
+        for candle in candles:
+            symbol = candle.get('symbol')
+            if symbol not in self._subscribed or candle.get('timeframe', self.timeframe) != self.timeframe:
+                continue
+            buf = self.store.buffer(symbol, self.timeframe)
+            last_time = buf.last_time
+            row = _candle_row(candle)
+            if not buf.append(row):
+                continue
+            if last_time is not None and row['time'] > last_time:
+                # A newer bar opened, so the previous one just closed. Bar events are never dropped;
+                # the view is taken now and excludes the bar that just opened.
+                view = buf.view(self.bars + 1)
+                self._queue.put_nowait(('bar', symbol, {field: column[:-1] for field, column in view.items()}))
+
+    async def _consume(self):
+        while True:
+            kind, symbol, payload = await self._queue.get()
+            handlers = self._bar_handlers if kind == 'bar' else self._tick_handlers
+            for handler in handlers:
+                try:
+                    await handler(symbol, payload)
+                except Exception as e:
+                    print(f"[STREAM][ERROR] {kind} handler failed for {symbol}: {e}")
+
+
+class QuoteFeeds:
+    """
+    Engine-side quote subscriptions: one quotes-only streaming feed for
+    `symbols` per quote source (broker server), opened in the background
+    through the first account seen on that server. A feed that fails to
+    connect is retried after `retry_delay` seconds.
+
+    The feed rides on that account's MetaApi client, which the pool may
+    close once the user goes idle. ensure() therefore drops a feed whose
+    client is no longer pooled (`is_live(client)`) or that has not had a
+    quote for `stale_after` seconds, and reopens it through the caller's
+    account.
+    """
+
+    def __init__(self, symbols=SYMBOLS, timeframe=ENGINE_TIMEFRAME, retry_delay=QUOTE_FEED_RETRY_DELAY,
+                 stale_after=QUOTE_FEED_STALE_AFTER, is_live=None):
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.retry_delay = retry_delay
+        self.stale_after = stale_after
+        self.is_live = is_live
+        self._feeds = {}  # source -> StreamingMarketFeed
+        self._clients = {}  # source -> MetaApi client the feed's account came from
+        self._starting = {}  # source -> asyncio.Task
+        self._closing = set()
+        self._failed_at = {}
+        self.failures = 0
+        self.reopened = 0
+
+    def ensure(self, account, client=None):
+        """Start the account's source feed if it is not running; never waits for the connection."""
+        source = quote_source(account)
+        if source in self._starting:
+            return
+        feed = self._feeds.get(source)
+        if feed is not None:
+            reason = self._dead(source, feed)
+            if reason is None:
+                return
+            print(f"[STREAM] Quote feed for {source} is {reason}, reopening")
+            self._drop(source)
+            self.reopened += 1
+        failed_at = self._failed_at.get(source)
+        if failed_at is not None and time.monotonic() - failed_at < self.retry_delay:
+            return
+        task = asyncio.create_task(self._start(source, account, client))
+        self._starting[source] = task
+        task.add_done_callback(lambda _: self._starting.pop(source, None))
+
+    def _dead(self, source, feed):
+        """Why the feed can no longer be trusted, or None while it is alive."""
+        client = self._clients.get(source)
+        if client is not None and self.is_live is not None and not self.is_live(client):
+            return "on a closed client"
+        last = feed.last_price_at or feed.started_at
+        if last is not None and time.monotonic() - last > self.stale_after:
+            return f"silent for {time.monotonic() - last:.0f}s"
+        return None
+
+    def _drop(self, source):
+        feed = self._feeds.pop(source)
+        self._clients.pop(source, None)
+        task = asyncio.create_task(self._close(source, feed))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, source, feed):
+        try:
+            await feed.stop()
+            await feed.connection.close()
+        except Exception as e:
+            print(f"[STREAM][ERROR] Closing quote feed for {source} failed: {e}")
+
+    async def _start(self, source, account, client):
+        try:
+            connection = account.get_streaming_connection()
+            await connection.connect()
+            await connection.wait_synchronized()
+            feed = StreamingMarketFeed(connection, self.symbols, timeframe=self.timeframe, candles=False,
+                                       source=source)
+            await feed.start()
+        except Exception as e:
+            self.failures += 1
+            self._failed_at[source] = time.monotonic()
+            print(f"[STREAM][ERROR] Quote feed for {source} failed: {e}")
+            return
+        self._failed_at.pop(source, None)
+        self._feeds[source] = feed
+        self._clients[source] = client
+
+    async def stop(self):
+        for task in list(self._starting.values()):
+            task.cancel()
+        await asyncio.gather(*self._starting.values(), return_exceptions=True)
+        for source in list(self._feeds):
+            self._drop(source)
+        await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def stats(self):
+        return {"feeds": sorted(self._feeds), "starting": len(self._starting), "failures": self.failures,
+                "reopened": self.reopened}
+
+
+# Shared quote subscriptions used by execution.run_trading_for_user
+quote_feeds = QuoteFeeds(is_live=metaapi_pool.holds_client)
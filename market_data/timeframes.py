@@ -0,0 +1,60 @@
+import datetime
+
+from config import SESSION_OFFSET
+
+# MetaApi timeframe strings → seconds
+TIMEFRAME_SECONDS = {
+    '1m': 60,
+    '5m': 5 * 60,
+    '15m': 15 * 60,
+    '30m': 30 * 60,
+    '1h': 60 * 60,
+    '4h': 4 * 60 * 60,
+    '1d': 24 * 60 * 60,
+}
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    try:
+        return TIMEFRAME_SECONDS[timeframe]
+    except KeyError:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+
+def bar_open(times, step: float, offset: float = SESSION_OFFSET):
+    """
+    Open of the bar containing each time (scalar or array). Bars are aligned
+    to multiples of `step` in broker server time, which runs `offset`
+    seconds ahead of UTC, the way MT brokers align H4 and D1 bars.
+    """
+    return ((times + offset) // step) * step - offset
+
+
+def current_bar_open(timeframe: str, now: float, offset: float = SESSION_OFFSET) -> float:
+    """Epoch seconds at which the bar containing `now` opened."""
+    return bar_open(now, timeframe_seconds(timeframe), offset)
+
+
+def last_closed_bar_open(timeframe: str, now: float, offset: float = SESSION_OFFSET) -> float:
+    """Epoch seconds at which the most recent fully closed bar opened."""
+    return current_bar_open(timeframe, now, offset) - timeframe_seconds(timeframe)
+
+
+def next_bar_close(timeframe: str, now: float, offset: float = SESSION_OFFSET) -> float:
+    """Epoch seconds at which the currently forming bar closes."""
+    return current_bar_open(timeframe, now, offset) + timeframe_seconds(timeframe)
+
+
+def to_datetime(epoch: float) -> datetime.datetime:
+    return datetime.datetime.utcfromtimestamp(epoch)
+
+
+def to_epoch(value) -> float:
+    """Convert a candle time (datetime, ISO string or number) to epoch seconds, treating naive values as UTC."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from config import ENGINE_TIMEFRAME, SNAPSHOT_RETRY_DELAY, SYMBOLS, SYMBOL_SCAN_CONCURRENCY, SYMBOL_SCAN_TIMEOUT
+from market_data.timeframes import last_closed_bar_open
+from strategy.strategy import analyze_symbol, score_trade
+
+SymbolScore = namedtuple("SymbolScore", ["analysis", "score"])
+
+
+class MarketSnapshot:
+    """
+    Immutable per-bar table of symbol -> SymbolScore shared by every user's
+    cycle. Analyses are read-only mappings; symbols whose analysis failed or
+    timed out are listed in `failed`.
+    """
+
+    __slots__ = ("bar_open", "created_at", "scores", "failed")
+
+    def __init__(self, bar_open, scores, failed):
+        self.bar_open = bar_open
+        self.created_at = time.time()
+        self.scores = MappingProxyType(scores)
+        self.failed = frozenset(failed)
+
+    def best(self, symbols=None):
+        """(symbol, analysis, score) of the highest score among `symbols`. Ties go to the symbol listed first."""
+        best_symbol, best = None, None
+        for symbol in symbols if symbols is not None else self.scores:
+            entry = self.scores.get(symbol)
+            if entry is not None and (best is None or entry.score > best.score):
+                best_symbol, best = symbol, entry
+        if best is None:
+            return None, None, -float('inf')
+        return best_symbol, best.analysis, best.score
+
+
+class MarketAnalysisStage:
+    """
+    Computes the MarketSnapshot once per closed bar of `timeframe`.
+
+    The first cycle of a bar runs the analysis with its own MetaApi client
+    (candles are the same for every account); concurrent cycles await the
+    same task. Failed symbols are retried in the background after
+    `retry_delay` seconds, doubling per retry within the bar; until a retry
+    finishes, callers get the partial snapshot without waiting.
+    """
+
+    def __init__(self, symbols=SYMBOLS, timeframe=ENGINE_TIMEFRAME, concurrency=SYMBOL_SCAN_CONCURRENCY,
+                 timeout=SYMBOL_SCAN_TIMEOUT, retry_delay=SNAPSHOT_RETRY_DELAY, analyze=analyze_symbol,
+                 clock=time.time):
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self._analyze = analyze
+        self._clock = clock
+        self._snapshot = None
+        self._inflight = None  # (bar_open, asyncio.Task)
+        self._retry_at = 0.0
+        self._retries = 0  # retries of the current bar
+        self.builds = 0
+        self.reuses = 0
+
+    async def snapshot(self, metaapi, account_id) -> MarketSnapshot:
+        now = self._clock()
+        bar_open = last_closed_bar_open(self.timeframe, now)
+        current = self._snapshot
+        inflight = self._inflight if self._inflight is not None and self._inflight[0] == bar_open else None
+
+        if current is not None and current.bar_open == bar_open:
+            self.reuses += 1
+            if current.failed and inflight is None and now >= self._retry_at:
+                # Retry in the background; this and later callers keep the partial snapshot meanwhile
+                self._start(metaapi, account_id, bar_open, current)
+            return current
+
+        if inflight is not None:
+            self.reuses += 1
+            task = inflight[1]
+        else:
+            self._retries = 0
+            task = self._start(metaapi, account_id, bar_open, None)
+
+        # Shield so one user's cycle being cancelled does not abort the analysis for everyone
+        return await asyncio.shield(task)
+
+    def _start(self, metaapi, account_id, bar_open, previous):
+        if previous is not None:
+            self._retries += 1
+        task = asyncio.ensure_future(self._build(metaapi, account_id, bar_open, previous))
+        self._inflight = (bar_open, task)
+        task.add_done_callback(self._clear_inflight)
+        return task
+
+    def _clear_inflight(self, task):
+        if self._inflight is not None and self._inflight[1] is task:
+            self._inflight = None
+
+    async def _build(self, metaapi, account_id, bar_open, previous) -> MarketSnapshot:
+        scores = dict(previous.scores) if previous is not None else {}
+        pending = [symbol for symbol in self.symbols if previous is None or symbol in previous.failed]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def scan(symbol):
+            async with semaphore:
+                return await asyncio.wait_for(self._analyze(metaapi, account_id, symbol), self.timeout)
+
+        results = await asyncio.gather(*(scan(symbol) for symbol in pending), return_exceptions=True)
+
+        failed = []
+        for symbol, analysis in zip(pending, results):
+            if isinstance(analysis, asyncio.TimeoutError):
+                print(f"[ENGINE][TIMEOUT] {symbol} analysis exceeded {self.timeout}s")
+                failed.append(symbol)
+                continue
+            if isinstance(analysis, BaseException):
+                print(f"[ENGINE][ERROR] {symbol} analysis failed: {analysis}")
+                failed.append(symbol)
+                continue
+            if not analysis:
+                continue
+            score = score_trade(analysis)
+            print(f"[ENGINE][SCORE] {symbol} → {score:.2f}")
+            scores[symbol] = SymbolScore(MappingProxyType(analysis), score)
+
+        snapshot = MarketSnapshot(bar_open, {symbol: scores[symbol] for symbol in self.symbols if symbol in scores}, failed)
+        self._snapshot = snapshot
+        self._retry_at = self._clock() + self.retry_delay * 2 ** self._retries
+        self.builds += 1
+        return snapshot
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "builds": self.builds,
+            "reuses": self.reuses,
+            "retries": self._retries,
+            "bar_open": snapshot.bar_open if snapshot is not None else None,
+            "symbols": len(snapshot.scores) if snapshot is not None else 0,
+            "failed": sorted(snapshot.failed) if snapshot is not None else [],
+        }
+
+
+# Shared stage used by execution.run_trading_for_user
+market_stage = MarketAnalysisStage()
@@ -1,8 +1,11 @@
 import asyncio
+import time
 from metaapi_cloud_sdk import MetaApi
 import os
 from dotenv import load_dotenv
 
+from config import METAAPI_POOL_IDLE_TTL, METAAPI_POOL_HEALTH_INTERVAL
+
 load_dotenv()
 META_API_TOKEN = os.getenv("META_API_TOKEN")
 
@@ -13,3 +16,152 @@ async def init_metaapi():
     metaapi = MetaApi(META_API_TOKEN)
     # Await something to ensure the loop stays alive
     await asyncio.sleep(0.1)
+
+
+# === Pooled MetaApi clients and account handles ===
+class _PooledClient:
+    __slots__ = ("api", "last_used")
+
+    def __init__(self, api):
+        self.api = api
+        self.last_used = time.monotonic()
+
+
+class _PooledAccount:
+    __slots__ = ("account", "last_used", "last_checked")
+
+    def __init__(self, account):
+        self.account = account
+        self.last_used = time.monotonic()
+        self.last_checked = self.last_used
+
+
+class MetaApiPool:
+    """
+    Process-wide pool of MetaApi clients keyed by token and account handles
+    keyed by (token, account_id), so trading cycles reuse warm handles.
+    """
+
+    def __init__(self, idle_ttl=METAAPI_POOL_IDLE_TTL, health_interval=METAAPI_POOL_HEALTH_INTERVAL):
+        self.idle_ttl = idle_ttl
+        self.health_interval = health_interval
+        self._clients = {}
+        self._accounts = {}
+        self._terminals = {}
+        self._locks = {}
+
+    def _lock(self, key):
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def get_client(self, token):
+        entry = self._clients.get(token)
+        if entry is None:
+            entry = self._clients[token] = _PooledClient(MetaApi(token))
+        entry.last_used = time.monotonic()
+        return entry.api
+
+    async def get_account(self, token, account_id, label=None):
+        """Return (metaapi, account) for a user, deploying and health-checking as needed."""
+        label = label or account_id
+        key = (token, account_id)
+        metaapi = self.get_client(token)
+
+        # One setup per account at a time; concurrent callers wait for the same handle
+        async with self._lock(key):
+            entry = self._accounts.get(key)
+            now = time.monotonic()
+
+            if entry is not None and now - entry.last_checked >= self.health_interval:
+                if not await self._is_healthy(entry.account, label):
+                    self.invalidate(token, account_id)
+                    entry = None
+                else:
+                    entry.last_checked = now
+
+            if entry is None:
+                account = await metaapi.metatrader_account_api.get_account(account_id)
+                await self._ensure_deployed(account, label)
+                entry = self._accounts[key] = _PooledAccount(account)
+
+            entry.last_used = time.monotonic()
+            return metaapi, entry.account
+
+    async def _is_healthy(self, account, label):
+        try:
+            await account.reload()
+        except Exception as e:
+            print(f"[{label}][POOL] Health check failed, rebuilding handle: {e}")
+            return False
+        if account.state != 'DEPLOYED':
+            print(f"[{label}][POOL] Account state is {account.state}, rebuilding handle")
+            return False
+        return True
+
+    async def _ensure_deployed(self, account, label):
+        if account.state != 'DEPLOYED':
+            print(f"[{label}] Deploying account...")
+            await account.deploy()
+            await account.wait_connected()
+        else:
+            print(f"[{label}] Account already deployed.")
+
+    async def get_terminal(self, account):
+        """Return the account's trading terminal, fetching it only once per pooled account."""
+        terminal = self._terminals.get(account.id)
+        if terminal is None:
+            terminal = self._terminals[account.id] = await account.get_terminal()
+        return terminal
+
+    def invalidate(self, token, account_id):
+        """Drop a cached account handle, e.g. after an unrecoverable API error."""
+        self._accounts.pop((token, account_id), None)
+        self._terminals.pop(account_id, None)
+
+    def evict_idle(self, now=None):
+        """Evict accounts and clients unused for longer than idle_ttl. Returns the number evicted."""
+        now = time.monotonic() if now is None else now
+        evicted = 0
+
+        for key, entry in list(self._accounts.items()):
+            if now - entry.last_used > self.idle_ttl and not self._lock(key).locked():
+                del self._accounts[key]
+                self._terminals.pop(key[1], None)
+                self._locks.pop(key, None)
+                evicted += 1
+
+        in_use = {token for token, _ in self._accounts}
+        for token, entry in list(self._clients.items()):
+            if token not in in_use and now - entry.last_used > self.idle_ttl:
+                del self._clients[token]
+                _close_client(entry.api)
+                evicted += 1
+        return evicted
+
+    def holds_client(self, api) -> bool:
+        """Whether `api` is still pooled, i.e. has not been evicted and closed."""
+        return any(entry.api is api for entry in self._clients.values())
+
+    def stats(self):
+        return {"clients": len(self._clients), "accounts": len(self._accounts)}
+
+    def close(self):
+        for entry in self._clients.values():
+            _close_client(entry.api)
+        self._clients.clear()
+        self._accounts.clear()
+        self._terminals.clear()
+        self._locks.clear()
+
+
+def _close_client(api):
+    try:
+        api.close()
+    except Exception as e:
+        print(f"[POOL] Failed to close MetaApi client: {e}")
+
+
+# Shared pool used by the trading engine
+metaapi_pool = MetaApiPool()
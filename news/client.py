@@ -0,0 +1,116 @@
+import asyncio
+import datetime
+import time
+from typing import Optional
+
+import aiohttp
+
+from config import NEWS_API_KEY, NEWS_CACHE_TTL, NEWS_ENDPOINT, NEWS_HTTP_TIMEOUT, NEWS_POOL_SIZE
+from news.lexicon import lexicon_scorer
+
+
+def headline_sentiment(title) -> str:
+    return lexicon_scorer.score(title).polarity
+
+
+def majority_sentiment(sentiments) -> Optional[str]:
+    sentiments = list(sentiments)
+    if not sentiments:
+        return None
+    return max(set(sentiments), key=sentiments.count)
+
+
+def classify_headlines(titles) -> Optional[str]:
+    """Majority sentiment of a list of headlines."""
+    return majority_sentiment(result.polarity for result in lexicon_scorer.score_batch(titles))
+
+
+class NewsSentimentClient:
+    """
+    Async news sentiment lookups over a pooled aiohttp session.
+
+    Results are cached per (symbol, lookback) for `ttl` seconds, and
+    concurrent lookups for the same key share one request.
+    """
+
+    def __init__(self, endpoint=NEWS_ENDPOINT, api_key=NEWS_API_KEY, timeout=NEWS_HTTP_TIMEOUT,
+                 pool_size=NEWS_POOL_SIZE, ttl=NEWS_CACHE_TTL, clock=time.monotonic):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.ttl = ttl
+        self._clock = clock
+        self._session = None
+        self._cache = {}  # key -> (expires_at, sentiment)
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def get_sentiment(self, symbol: str, lookback_minutes=60) -> Optional[str]:
+        key = (symbol, lookback_minutes)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > self._clock():
+            self.hits += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fetch(symbol, lookback_minutes))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _, key=key: self._inflight.pop(key, None))
+        else:
+            self.hits += 1
+        return await asyncio.shield(task)
+
+    async def fetch_articles(self, query: str, since: datetime.datetime, page_size=10, page=1) -> list:
+        """One page of raw articles matching `query` published after the aware `since` (newest first)."""
+        params = {
+            'q': query,
+            'from': since.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S'),
+            'sortBy': 'publishedAt',
+            'apiKey': self.api_key,
+            'language': 'en',
+            'pageSize': page_size,
+            'page': page,
+        }
+        async with self._get_session().get(self.endpoint, params=params) as response:
+            response.raise_for_status()
+            news = await response.json(content_type=None)
+        return news.get('articles') or []
+
+    async def _fetch(self, symbol, lookback_minutes):
+        since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(minutes=lookback_minutes)
+        try:
+            articles = await self.fetch_articles(symbol, since)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            # Failures are not cached so the next lookup retries
+            self.errors += 1
+            print(f"[NEWS][ERROR] Sentiment lookup for {symbol} failed: {e!r}")
+            return None
+
+        sentiment = classify_headlines(article.get('title') for article in articles)
+        self._cache[(symbol, lookback_minutes)] = (self._clock() + self.ttl, sentiment)
+        return sentiment
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "entries": len(self._cache)}
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+# Shared client used by strategy.check_news_sentiment
+news_client = NewsSentimentClient()
@@ -0,0 +1,195 @@
+import asyncio
+import datetime
+import re
+import time
+from collections import deque
+from typing import Optional
+
+from config import (
+    NEWS_INGEST_INTERVAL,
+    NEWS_INGEST_MAX_PAGES,
+    NEWS_INGEST_OVERLAP,
+    NEWS_INGEST_PAGE_SIZE,
+    NEWS_INGEST_QUERY,
+    NEWS_RETENTION_MINUTES,
+    SYMBOLS,
+)
+from market_data.timeframes import to_epoch
+from news.client import headline_sentiment, majority_sentiment, news_client
+from news.lexicon import lexicon_scorer
+
+# Lower-case words that refer to each currency or instrument
+CURRENCY_ALIASES = {
+    'EUR': ('eur', 'euro', 'euros', 'eurozone', 'ecb', 'lagarde'),
+    'USD': ('usd', 'dollar', 'dollars', 'greenback', 'fed', 'fomc', 'powell'),
+    'GBP': ('gbp', 'sterling', 'pound', 'cable', 'boe'),
+    'JPY': ('jpy', 'yen', 'boj'),
+    'CHF': ('chf', 'franc', 'snb', 'swissie'),
+    'CAD': ('cad', 'loonie', 'boc'),
+    'AUD': ('aud', 'aussie', 'rba'),
+    'NZD': ('nzd', 'kiwi', 'rbnz'),
+    'XAU': ('xau', 'gold', 'bullion'),
+    'BTC': ('btc', 'bitcoin', 'crypto'),
+    'ETH': ('eth', 'ether', 'ethereum', 'crypto'),
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:/[a-z0-9]+)?")
+
+
+def tokenize(text: str) -> set:
+    return set(_TOKEN.findall((text or '').lower()))
+
+
+def build_alias_index(symbols=SYMBOLS) -> dict:
+    """Map every alias token to the symbols it refers to."""
+    index = {}
+    for symbol in symbols:
+        base, quote = symbol[:3], symbol[3:]
+        tokens = {symbol.lower(), f"{base}/{quote}".lower()}
+        for code in (base, quote):
+            tokens.update(CURRENCY_ALIASES.get(code, (code.lower(),)))
+        for token in tokens:
+            index.setdefault(token, set()).add(symbol)
+    return index
+
+
+class HeadlineIndex:
+    """In-memory inverted index from symbol to time-ordered (published_at, sentiment) postings."""
+
+    def __init__(self, symbols=SYMBOLS, retention_minutes=NEWS_RETENTION_MINUTES, clock=time.time):
+        self.aliases = build_alias_index(symbols)
+        self.retention = retention_minutes * 60
+        self._clock = clock
+        self._postings = {symbol: deque() for symbol in symbols}
+        self._seen = {}  # headline key -> published_at, for dedupe across pulls
+
+    def add(self, title: str, published_at: float, key=None, sentiment=None) -> int:
+        """Tokenize and score a headline once and post it under every symbol it mentions."""
+        key = key or title
+        if not title or key in self._seen or published_at < self._clock() - self.retention:
+            return 0
+        self._seen[key] = published_at
+        symbols = set()
+        for token in tokenize(title):
+            symbols.update(self.aliases.get(token, ()))
+        sentiment = sentiment or headline_sentiment(title)
+        for symbol in symbols:
+            postings = self._postings[symbol]
+            # Late arrivals from an overlapping pull slot in near the tail to keep postings time-ordered
+            i = len(postings)
+            while i and postings[i - 1][0] > published_at:
+                i -= 1
+            postings.insert(i, (published_at, sentiment))
+        return len(symbols)
+
+    def evict(self, now=None) -> int:
+        cutoff = (self._clock() if now is None else now) - self.retention
+        evicted = 0
+        for postings in self._postings.values():
+            while postings and postings[0][0] < cutoff:
+                postings.popleft()
+                evicted += 1
+        for key, published_at in list(self._seen.items()):
+            if published_at < cutoff:
+                del self._seen[key]
+        return evicted
+
+    def sentiment(self, symbol: str, lookback_minutes=60, now=None) -> Optional[str]:
+        postings = self._postings.get(symbol)
+        if not postings:
+            return None
+        cutoff = (self._clock() if now is None else now) - lookback_minutes * 60
+        recent = []
+        for published_at, sentiment in reversed(postings):
+            if published_at < cutoff:
+                break
+            recent.append(sentiment)
+        return majority_sentiment(recent)
+
+    def stats(self):
+        return {
+            "headlines": len(self._seen),
+            "postings": {symbol: len(postings) for symbol, postings in self._postings.items()},
+        }
+
+
+class HeadlineIngester:
+    """Background task that pulls the latest headlines in bulk once per interval into a HeadlineIndex."""
+
+    def __init__(self, client=news_client, index=None, interval=NEWS_INGEST_INTERVAL,
+                 query=NEWS_INGEST_QUERY, page_size=NEWS_INGEST_PAGE_SIZE, max_pages=NEWS_INGEST_MAX_PAGES,
+                 overlap=NEWS_INGEST_OVERLAP):
+        self.client = client
+        self.index = index or HeadlineIndex()
+        self.interval = interval
+        self.query = query
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.overlap = overlap
+        self._task = None
+        self._last_pull = None
+        self.pulls = 0
+        self.errors = 0
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def _fetch_pages(self, since) -> list:
+        """Every article since `since`, newest first, stopping at a short page or `max_pages`."""
+        articles = []
+        for page in range(1, self.max_pages + 1):
+            batch = await self.client.fetch_articles(self.query, since, page_size=self.page_size, page=page)
+            articles.extend(batch)
+            if len(batch) < self.page_size:
+                return articles
+        print(f"[NEWS][WARN] Pull hit {self.max_pages} page(s); older headlines since {since:%H:%M:%S} were skipped")
+        return articles
+
+    async def pull(self) -> int:
+        pulled_at = datetime.datetime.now(datetime.timezone.utc)
+        if self._last_pull is None:
+            since = pulled_at - datetime.timedelta(seconds=self.index.retention)
+        else:
+            # Re-read a margin before the last pull for late-indexed articles; the URL key dedupes them
+            since = self._last_pull - datetime.timedelta(seconds=self.overlap)
+        articles = await self._fetch_pages(since)
+        added = 0
+        # Oldest first so postings stay time-ordered; the whole pull is scored in one batch
+        articles = list(reversed(articles))
+        scores = lexicon_scorer.score_batch(article.get('title') for article in articles)
+        for article, score in zip(articles, scores):
+            published = article.get('publishedAt')
+            published_at = to_epoch(published) if published else pulled_at.timestamp()
+            added += bool(self.index.add(article.get('title'), published_at, key=article.get('url'),
+                                         sentiment=score.polarity))
+        self._last_pull = pulled_at
+        self.index.evict()
+        self.pulls += 1
+        return added
+
+    async def _run(self):
+        while True:
+            try:
+                added = await self.pull()
+                print(f"[NEWS][INGEST] Indexed {added} new headline(s)")
+            except Exception as e:
+                # Any failure only skips this pull; the loop must outlive it
+                self.errors += 1
+                print(f"[NEWS][ERROR] Bulk headline pull failed: {e!r}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# Shared ingester; started by the engine in main.py
+news_ingester = HeadlineIngester()
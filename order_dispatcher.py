@@ -0,0 +1,254 @@
+import asyncio
+import bisect
+import time
+import uuid
+from collections import OrderedDict
+
+from metaapi_cloud_sdk.clients.error_handler import InternalException, TooManyRequestsException
+from metaapi_cloud_sdk.clients.metaapi.not_connected_exception import NotConnectedException
+from metaapi_cloud_sdk.clients.metaapi.not_synchronized_exception import NotSynchronizedException
+from metaapi_cloud_sdk.clients.timeout_exception import TimeoutException
+
+from config import ORDER_MAX_RETRIES, ORDER_QUEUE_SIZE, ORDER_RETRY_BASE_DELAY, ORDER_WORKER_IDLE_TIMEOUT
+from market_data.quote_cache import quote_cache, quote_source
+from metaapi_connector import metaapi_pool
+
+# Failures worth retrying; anything else (validation, trade rejections) fails the order immediately.
+# Once create_market_order has been sent, any of these leaves the order's fate unknown, so the
+# broker is checked for its client id before every retry.
+TRANSIENT_ERRORS = (
+    TimeoutException, TooManyRequestsException, InternalException,
+    NotConnectedException, NotSynchronizedException,
+    asyncio.TimeoutError, ConnectionError,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket containing the p-th percentile (0-100)."""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for bound, n in zip(self.BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return self.BUCKETS_MS[-1]
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "buckets": {str(bound): n for bound, n in zip(self.BUCKETS_MS, self.counts)},
+        }
+
+
+class OrderRequest:
+    __slots__ = ("account", "signal", "symbol", "lot_size", "sl_pips", "tp_pips", "client_id", "label", "enqueued_at",
+                 "sent")
+
+    def __init__(self, account, signal, symbol, lot_size, sl_pips, tp_pips, client_id, label):
+        self.account = account
+        self.signal = signal
+        self.symbol = symbol
+        self.lot_size = lot_size
+        self.sl_pips = sl_pips
+        self.tp_pips = tp_pips
+        self.client_id = client_id
+        self.label = label
+        self.enqueued_at = time.monotonic()
+        self.sent = False  # set once any attempt has reached create_market_order
+
+
+def new_client_id() -> str:
+    # MetaApi allows at most 31 characters for clientId
+    return f"SNT{uuid.uuid4().hex[:24]}"
+
+
+class OrderDispatcher:
+    """
+    One async queue and worker per account. Orders carry a client id that
+    stays the same across retries, so a retried order is never sent twice
+    once the broker has it.
+    """
+
+    def __init__(self, queue_size=ORDER_QUEUE_SIZE, max_retries=ORDER_MAX_RETRIES,
+                 retry_base_delay=ORDER_RETRY_BASE_DELAY, idle_timeout=ORDER_WORKER_IDLE_TIMEOUT):
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.idle_timeout = idle_timeout
+        self._queues = {}
+        self._workers = {}
+        self._seen = OrderedDict()  # recent client ids, newest last
+        self.latency = LatencyHistogram()
+        self.placed = 0
+        self.failed = 0
+        self.retried = 0
+
+    async def submit(self, account, signal, symbol, lot_size, sl_pips, tp_pips, client_id=None, label=None):
+        """Enqueue an order and return its client id; waits only if the account's queue is full."""
+        client_id = client_id or new_client_id()
+        if client_id in self._seen:
+            return client_id
+        self._remember(client_id)
+
+        queue = self._queues.get(account.id)
+        if queue is None:
+            queue = self._queues[account.id] = asyncio.Queue(maxsize=self.queue_size)
+        worker = self._workers.get(account.id)
+        if worker is None or worker.done():
+            self._workers[account.id] = asyncio.create_task(self._worker(account.id, queue))
+
+        await queue.put(OrderRequest(account, signal, symbol, lot_size, sl_pips, tp_pips, client_id, label or account.id))
+        return client_id
+
+    def _remember(self, client_id, limit=10000):
+        self._seen[client_id] = True
+        while len(self._seen) > limit:
+            self._seen.popitem(last=False)
+
+    async def _worker(self, account_id, queue):
+        while True:
+            try:
+                order = await asyncio.wait_for(queue.get(), self.idle_timeout)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    self._queues.pop(account_id, None)
+                    self._workers.pop(account_id, None)
+                    return
+                continue
+            try:
+                await self._dispatch(order)
+            finally:
+                queue.task_done()
+
+    async def _dispatch(self, order):
+        attempt = 0
+        while True:
+            if order.sent:
+                # An earlier attempt may have reached the broker; never resend without checking
+                placed = await self._already_placed(order)
+                if placed:
+                    self._observe_ack(order)
+                    self.placed += 1
+                    print(f"[{order.label}][RESULT] ✅ Trade {order.client_id} found on broker before retry")
+                    return None
+                if placed is None:
+                    error = "could not verify earlier attempt"
+                    if not await self._backoff(order, attempt, error):
+                        return None
+                    attempt += 1
+                    continue
+            try:
+                result = await self._place(order)
+                self._observe_ack(order)
+                self.placed += 1
+                print(f"[{order.label}][RESULT] ✅ Trade placed ({order.client_id}): {result}")
+                return result
+            except TRANSIENT_ERRORS as e:
+                error = e
+            except Exception as e:
+                self.failed += 1
+                print(f"[{order.label}][ERROR] ❌ Trade execution failed: {e}")
+                return None
+            if attempt >= self.max_retries and order.sent and await self._already_placed(order):
+                self._observe_ack(order)
+                self.placed += 1
+                print(f"[{order.label}][RESULT] ✅ Trade {order.client_id} found on broker after last attempt")
+                return None
+            if not await self._backoff(order, attempt, error):
+                return None
+            attempt += 1
+
+    async def _backoff(self, order, attempt, error):
+        """Sleep before retry `attempt + 1`; False (order failed) once retries are exhausted."""
+        if attempt >= self.max_retries:
+            self.failed += 1
+            print(f"[{order.label}][ERROR] ❌ Trade {order.client_id} failed after {attempt + 1} attempts: {error}")
+            return False
+        delay = self.retry_base_delay * (2 ** attempt)
+        self.retried += 1
+        print(f"[{order.label}][RETRY] {order.client_id} attempt {attempt + 1} in {delay:.2f}s: {error}")
+        await asyncio.sleep(delay)
+        return True
+
+    def _observe_ack(self, order):
+        # Submit to ack: includes queue wait, failed attempts and retry backoff
+        self.latency.observe((time.monotonic() - order.enqueued_at) * 1000)
+
+    async def _place(self, order):
+        terminal = await metaapi_pool.get_terminal(order.account)
+        price = (await quote_cache.get_or_fetch(quote_source(order.account), order.symbol, terminal.get_symbol_price)).bid
+
+        if order.signal == 'buy':
+            sl = price - order.sl_pips
+            tp = price + order.tp_pips
+        else:
+            sl = price + order.sl_pips
+            tp = price - order.tp_pips
+
+        print(f"[{order.label}][ORDER] Placing {order.signal.upper()} order on {order.symbol} at {price:.5f}")
+        order.sent = True
+        return await terminal.create_market_order(
+            order.symbol, order.signal, order.lot_size, sl, tp, options={'clientId': order.client_id}
+        )
+
+    async def _already_placed(self, order):
+        """
+        Check the broker for a position or pending order carrying this client
+        id. Returns None when the check itself failed.
+        """
+        try:
+            terminal = await metaapi_pool.get_terminal(order.account)
+            for getter in ('get_positions', 'get_orders'):
+                if hasattr(terminal, getter):
+                    for item in await getattr(terminal, getter)():
+                        if item.get('clientId') == order.client_id:
+                            return True
+        except Exception as e:
+            print(f"[{order.label}][WARN] Could not verify {order.client_id}: {e}")
+            return None
+        return False
+
+    async def drain(self):
+        """Wait until every queued order has been processed."""
+        await asyncio.gather(*(queue.join() for queue in list(self._queues.values())))
+
+    async def close(self):
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+    def stats(self):
+        return {
+            "placed": self.placed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "pending": sum(queue.qsize() for queue in self._queues.values()),
+            "submit_to_ack": self.latency.snapshot(),
+        }
+
+
+# Shared dispatcher used by execution.execute_trade
+order_dispatcher = OrderDispatcher()
@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+from config import ENGINE_TIMEFRAME, SCHEDULER_CLOSE_DELAY, SCHEDULER_JITTER
+from market_data.timeframes import next_bar_close, timeframe_seconds
+
+
+class BarCloseScheduler:
+    """
+    Long-running loop that wakes just after every bar close of `timeframe`
+    and runs one trading cycle per active user.
+
+    Each tick hands its users to `run_users(users, jitter=..., on_done=...)`
+    as one batch (the executor's bounded worker pool) and logs the
+    CycleReport it returns. A user whose cycle from an earlier tick is still
+    queued or running is skipped and counted as an overrun; each user is
+    released through `on_done` as soon as its own cycle ends. Ticks lost because the
+    loop woke up late are counted as missed. `before_tick` is awaited right
+    before users are read, e.g. to pull registry changes; `claim_users(users,
+    bar_close)` is then awaited to narrow them to the ones this process may
+    run for that bar (see sharding.ShardCoordinator.claim).
+    """
+
+    def __init__(self, get_users, run_users, timeframe=ENGINE_TIMEFRAME, close_delay=SCHEDULER_CLOSE_DELAY,
+                 jitter=SCHEDULER_JITTER, on_tick=None, before_tick=None, claim_users=None, clock=time.time):
+        self.get_users = get_users
+        self.before_tick = before_tick
+        self.claim_users = claim_users
+        self.run_users = run_users
+        self.timeframe = timeframe
+        self.close_delay = close_delay
+        self.jitter = jitter
+        self.on_tick = on_tick
+        self._clock = clock
+        self._active = set()  # user ids queued or running in an unfinished batch
+        self._batches = set()  # asyncio.Task per unfinished tick
+        self._stopped = asyncio.Event()
+        self.ticks = 0
+        self.missed_ticks = 0
+        self.overruns = 0
+        self.last_report = None
+
+    def next_wakeup(self, now: float) -> float:
+        return next_bar_close(self.timeframe, now) + self.close_delay
+
+    async def run_forever(self):
+        step = timeframe_seconds(self.timeframe)
+        wakeup = self.next_wakeup(self._clock())
+        print(f"[SCHEDULER] Running on {self.timeframe} bar closes, first tick at {wakeup:.0f}")
+
+        while not self._stopped.is_set():
+            delay = wakeup - self._clock()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+
+            now = self._clock()
+            missed = int((now - wakeup) // step)
+            if missed > 0:
+                self.missed_ticks += missed
+                print(f"[SCHEDULER][MISSED] Woke {now - wakeup:.1f}s late, skipped {missed} tick(s)")
+                wakeup += missed * step
+
+            if self.before_tick is not None:
+                await self.before_tick()
+            users = self.get_users()
+            if self.claim_users is not None and users:
+                try:
+                    users = await self.claim_users(users, wakeup - self.close_delay)
+                except Exception as e:
+                    # Without a claim no user may run: another worker could be running them
+                    print(f"[SCHEDULER][ERROR] Claiming users failed, skipping tick: {e}")
+                    users = []
+            self.tick(users)
+            wakeup += step
+
+        await self.shutdown()
+
+    def tick(self, users=None):
+        self.ticks += 1
+        if users is None:
+            users = self.get_users()
+        if not users:
+            print("⚠️ No active users found. Trading Engine paused.")
+
+        batch = []
+        for user in users or []:
+            if user.id in self._active:
+                self.overruns += 1
+                print(f"[{user.id}][SCHEDULER][OVERRUN] Previous cycle still running, skipping this tick")
+                continue
+            batch.append(user)
+
+        print(f"[SCHEDULER] Tick {self.ticks}: starting {len(batch)} cycle(s), {self.overruns} overrun(s) so far")
+        if batch:
+            self._active.update(user.id for user in batch)
+            task = asyncio.create_task(self._run_batch(self.ticks, batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+        if self.on_tick is not None:
+            self.on_tick()
+
+    async def _run_batch(self, tick, users):
+        try:
+            # run_users logs the report; keep the latest for stats()
+            self.last_report = await self.run_users(users, jitter=self.jitter, on_done=self._release)
+            return self.last_report
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[SCHEDULER][ERROR] Tick {tick} failed: {e}")
+        finally:
+            self._active.difference_update(user.id for user in users)
+
+    def _release(self, user):
+        self._active.discard(user.id)
+
+    def stop(self):
+        self._stopped.set()
+
+    async def shutdown(self):
+        tasks = [task for task in self._batches if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._batches.clear()
+        self._active.clear()
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "missed_ticks": self.missed_ticks,
+            "overruns": self.overruns,
+            "running": len(self._active),
+            "last_report": self.last_report.summary() if self.last_report is not None else None,
+        }
@@ -0,0 +1,206 @@
+import asyncio
+import bisect
+import datetime
+import hashlib
+import multiprocessing
+import os
+import socket
+
+from sqlalchemy.exc import IntegrityError
+
+from config import SHARD_CLAIM_RETENTION, SHARD_HEARTBEAT_INTERVAL, SHARD_LEASE_TTL, SHARD_VNODES, SHARD_WORKER_ID
+from app.database import PrimarySessionLocal, dispose_inherited_pools
+from app.models import ShardClaim, ShardLease
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent hash ring; adding or removing a node only moves about 1/N of the keys."""
+
+    def __init__(self, nodes=(), vnodes: int = SHARD_VNODES):
+        self.vnodes = vnodes
+        self.nodes = tuple(sorted(nodes))
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key) -> str:
+        if not self._hashes:
+            return None
+        idx = bisect.bisect(self._hashes, _hash(str(key))) % len(self._hashes)
+        return self._owners[idx]
+
+
+class ShardCoordinator:
+    """
+    Tracks live engine workers through lease rows in `shard_leases` and
+    decides which users this worker owns via consistent hashing on user id.
+    Workers on any host sharing the database take part in the same ring.
+
+    Ring ownership only spreads the load: two workers may briefly disagree
+    on membership around a join or leave. Each tick therefore renews the
+    lease, rebuilds the ring and then claims its users' (user, bar close)
+    rows in `shard_claims` (claim); a user runs only on the worker whose
+    claim row was inserted, so no bar is traded twice.
+    """
+
+    def __init__(self, worker_id=SHARD_WORKER_ID, session_factory=PrimarySessionLocal,
+                 lease_ttl=SHARD_LEASE_TTL, heartbeat_interval=SHARD_HEARTBEAT_INTERVAL,
+                 claim_retention=SHARD_CLAIM_RETENTION):
+        self.host = socket.gethostname()
+        self.worker_id = worker_id or f"{self.host}-{os.getpid()}"
+        self.session_factory = session_factory
+        self.lease_ttl = lease_ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.claim_retention = claim_retention
+        self.ring = HashRing([self.worker_id])
+        self._heartbeat_task = None
+        self.claimed = 0
+        self.lost_claims = 0  # owned by the ring but already claimed by another worker
+
+    def renew(self):
+        """Renew this worker's lease, drop expired ones and rebuild the ring from live workers."""
+        now = datetime.datetime.utcnow()
+        db = self.session_factory()
+        try:
+            lease = db.query(ShardLease).filter(ShardLease.worker_id == self.worker_id).first()
+            if lease is None:
+                lease = ShardLease(worker_id=self.worker_id, host=self.host, pid=os.getpid())
+                db.add(lease)
+            lease.heartbeat_at = now
+            lease.expires_at = now + datetime.timedelta(seconds=self.lease_ttl)
+            db.query(ShardLease).filter(ShardLease.expires_at <= now).delete(synchronize_session=False)
+            db.commit()
+            workers = [row.worker_id for row in db.query(ShardLease.worker_id).all()]
+        finally:
+            db.close()
+
+        if tuple(sorted(workers)) != self.ring.nodes:
+            print(f"[SHARD][{self.worker_id}] Ring membership changed: {sorted(workers)}")
+            self.ring = HashRing(workers, self.ring.vnodes)
+
+    def release(self):
+        db = self.session_factory()
+        try:
+            db.query(ShardLease).filter(ShardLease.worker_id == self.worker_id).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def owns(self, user_id) -> bool:
+        return self.ring.node_for(user_id) == self.worker_id
+
+    def filter_users(self, users):
+        return [user for user in users if self.owns(user.id)]
+
+    def claim_blocking(self, users, bar_close):
+        """Renew the lease, then claim (user, bar_close) for the users this worker owns. Returns the claimed users."""
+        self.renew()
+        owned = self.filter_users(users)
+        if not owned:
+            return []
+        bar_close = int(bar_close)
+        ids = [user.id for user in owned]
+        db = self.session_factory()
+        try:
+            for start in range(0, len(ids), 500):
+                self._insert_claims(db, [{'user_id': user_id, 'bar_close': bar_close, 'worker_id': self.worker_id,
+                                          'claimed_at': datetime.datetime.utcnow()}
+                                         for user_id in ids[start:start + 500]])
+            db.query(ShardClaim).filter(ShardClaim.bar_close < bar_close - self.claim_retention).delete(
+                synchronize_session=False)
+            db.commit()
+            mine = set()
+            for start in range(0, len(ids), 500):
+                mine.update(row.user_id for row in db.query(ShardClaim.user_id).filter(
+                    ShardClaim.bar_close == bar_close,
+                    ShardClaim.worker_id == self.worker_id,
+                    ShardClaim.user_id.in_(ids[start:start + 500]),
+                ))
+        finally:
+            db.close()
+
+        claimed = [user for user in owned if user.id in mine]
+        self.claimed += len(claimed)
+        if len(claimed) < len(owned):
+            self.lost_claims += len(owned) - len(claimed)
+            print(f"[SHARD][{self.worker_id}] {len(owned) - len(claimed)} user(s) already claimed by another worker")
+        return claimed
+
+    async def claim(self, users, bar_close):
+        return await asyncio.to_thread(self.claim_blocking, users, bar_close)
+
+    @staticmethod
+    def _insert_claims(db, rows):
+        dialect = db.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+        if insert is not None:
+            db.execute(insert(ShardClaim).values(rows).on_conflict_do_nothing())
+            return
+        # Portable fallback: one savepoint per row, losing rows raise on the primary key
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.add(ShardClaim(**row))
+            except IntegrityError:
+                pass
+
+    def stats(self):
+        return {"workers": len(self.ring.nodes), "claimed": self.claimed, "lost_claims": self.lost_claims}
+
+    async def start(self):
+        await asyncio.to_thread(self.renew)
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_forever())
+        print(f"[SHARD][{self.worker_id}] Joined ring with {len(self.ring.nodes)} worker(s)")
+
+    async def stop(self):
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+        await asyncio.to_thread(self.release)
+        print(f"[SHARD][{self.worker_id}] Left ring")
+
+    async def _heartbeat_forever(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await asyncio.to_thread(self.renew)
+            except Exception as e:
+                print(f"[SHARD][{self.worker_id}][ERROR] Lease renewal failed: {e}")
+
+
+def worker_id_for(index: int, base=SHARD_WORKER_ID):
+    """
+    Ring id for local worker `index`. A configured SHARD_WORKER_ID is shared
+    by every local process, so it gets a per-process suffix; without one the
+    coordinator falls back to <hostname>-<pid>, which is already unique.
+    """
+    return f"{base}-{index}" if base else None
+
+
+def _worker_main(target, index):
+    # Connections pooled before the fork (e.g. by create_all) belong to the parent
+    dispose_inherited_pools()
+    target(worker_id_for(index))
+
+
+def run_worker_processes(count: int, target):
+    """Start `count` local engine processes running `target(worker_id)` and wait for them."""
+    processes = [multiprocessing.Process(target=_worker_main, args=(target, i), name=f"engine-worker-{i}")
+                 for i in range(count)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
@@ -0,0 +1,212 @@
+from collections import deque
+from types import MappingProxyType
+
+import numpy as np
+
+
+# === O(1) building blocks ===
+# Every indicator has update(x), which commits a closed bar, and peek(x),
+# which returns the value the indicator would have if x were the next bar
+# without changing state (used for the still-forming bar).
+
+class SMA:
+    __slots__ = ("period", "_window", "_sum", "value")
+
+    def __init__(self, period):
+        self.period = period
+        self._window = deque()
+        self._sum = 0.0
+        self.value = None
+
+    def update(self, x):
+        self._window.append(x)
+        self._sum += x
+        if len(self._window) > self.period:
+            self._sum -= self._window.popleft()
+        if len(self._window) == self.period:
+            self.value = self._sum / self.period
+        return self.value
+
+    def peek(self, x):
+        size = len(self._window) + 1
+        if size < self.period:
+            return None
+        dropped = self._window[0] if size > self.period else 0.0
+        return (self._sum - dropped + x) / self.period
+
+
+class _SmoothedAverage:
+    """Average seeded with the SMA of the first `period` values, then smoothed by `alpha`."""
+
+    __slots__ = ("period", "alpha", "_count", "_seed_sum", "value")
+
+    def __init__(self, period, alpha):
+        self.period = period
+        self.alpha = alpha
+        self._count = 0
+        self._seed_sum = 0.0
+        self.value = None
+
+    def update(self, x):
+        self.value = self.peek(x)
+        self._count += 1
+        if self._count <= self.period:
+            self._seed_sum += x
+        return self.value
+
+    def peek(self, x):
+        if self._count + 1 < self.period:
+            return None
+        if self._count + 1 == self.period:
+            return (self._seed_sum + x) / self.period
+        return self.value + self.alpha * (x - self.value)
+
+
+class EMA(_SmoothedAverage):
+    __slots__ = ()
+
+    def __init__(self, period):
+        super().__init__(period, 2.0 / (period + 1))
+
+
+class WilderAverage(_SmoothedAverage):
+    __slots__ = ()
+
+    def __init__(self, period):
+        super().__init__(period, 1.0 / period)
+
+
+class WilderRSI:
+    __slots__ = ("_prev_close", "_gain", "_loss", "value")
+
+    def __init__(self, period=14):
+        self._prev_close = None
+        self._gain = WilderAverage(period)
+        self._loss = WilderAverage(period)
+        self.value = None
+
+    def update(self, close):
+        if self._prev_close is not None:
+            change = close - self._prev_close
+            self.value = _rsi(self._gain.update(max(change, 0.0)), self._loss.update(max(-change, 0.0)))
+        self._prev_close = close
+        return self.value
+
+    def peek(self, close):
+        if self._prev_close is None:
+            return None
+        change = close - self._prev_close
+        return _rsi(self._gain.peek(max(change, 0.0)), self._loss.peek(max(-change, 0.0)))
+
+
+def _rsi(avg_gain, avg_loss):
+    if avg_gain is None or avg_loss is None:
+        return None
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+class ATR:
+    __slots__ = ("_prev_close", "_average", "value")
+
+    def __init__(self, period=14):
+        self._prev_close = None
+        self._average = WilderAverage(period)
+        self.value = None
+
+    def _true_range(self, high, low):
+        if self._prev_close is None:
+            return high - low
+        return max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+
+    def update(self, high, low, close):
+        self.value = self._average.update(self._true_range(high, low))
+        self._prev_close = close
+        return self.value
+
+    def peek(self, high, low, close):
+        return self._average.peek(self._true_range(high, low))
+
+
+# === Per-symbol indicator set ===
+class IndicatorSet:
+    """RSI, ATR, EMA, SMA and rolling volume mean for one symbol/timeframe."""
+
+    def __init__(self, rsi_period=14, atr_period=14, ema_period=20, sma_period=20, volume_period=10):
+        self.rsi = WilderRSI(rsi_period)
+        self.atr = ATR(atr_period)
+        self.ema = EMA(ema_period)
+        self.sma = SMA(sma_period)
+        self.volume_mean = SMA(volume_period)
+
+    def update(self, high, low, close, volume):
+        self.rsi.update(close)
+        self.atr.update(high, low, close)
+        self.ema.update(close)
+        self.sma.update(close)
+        self.volume_mean.update(volume)
+
+    def peek(self, high, low, close, volume) -> dict:
+        return {
+            'rsi': self.rsi.peek(close),
+            'atr': self.atr.peek(high, low, close),
+            'ema': self.ema.peek(close),
+            'sma': self.sma.peek(close),
+            'volume_mean': self.volume_mean.peek(volume),
+        }
+
+
+def compute_indicators(candles) -> MappingProxyType:
+    """One-off indicator snapshot for the newest bar of a column dict or DataFrame."""
+    high, low, close, volume = (np.asarray(candles[field], dtype=np.float64) for field in ('high', 'low', 'close', 'volume'))
+    if not len(close):
+        return MappingProxyType({})
+    indicators = IndicatorSet()
+    for i in range(len(close) - 1):
+        indicators.update(high[i], low[i], close[i], volume[i])
+    return MappingProxyType(indicators.peek(high[-1], low[-1], close[-1], volume[-1]))
+
+
+# === Shared engine ===
+class IndicatorEngine:
+    """
+    One IndicatorSet per (symbol, timeframe), shared by all users.
+
+    sync() commits bars older than the newest one exactly once and evaluates
+    the newest (possibly still forming) bar with peek(). The resulting
+    read-only snapshot is cached until the newest bar changes, so every
+    user evaluating the same symbol gets the same object.
+    """
+
+    def __init__(self, **periods):
+        self.periods = periods
+        self._states = {}  # (symbol, timeframe) -> [IndicatorSet, committed_time, snapshot_key, snapshot]
+
+    def sync(self, symbol: str, timeframe: str, candles: dict) -> MappingProxyType:
+        times = candles['time']
+        if not len(times):
+            return MappingProxyType({})
+
+        state = self._states.get((symbol, timeframe))
+        if state is None:
+            state = self._states[(symbol, timeframe)] = [IndicatorSet(**self.periods), -np.inf, None, None]
+        indicators, committed_time = state[0], state[1]
+
+        high, low, close, volume = candles['high'], candles['low'], candles['close'], candles['volume']
+        last = len(times) - 1
+        start = int(np.searchsorted(times, committed_time, side='right'))
+        for i in range(start, last):
+            indicators.update(high[i], low[i], close[i], volume[i])
+        if start < last:
+            state[1] = times[last - 1]
+
+        key = (times[last], high[last], low[last], close[last], volume[last])
+        if state[2] != key:
+            state[2] = key
+            state[3] = MappingProxyType(indicators.peek(high[last], low[last], close[last], volume[last]))
+        return state[3]
+
+
+# Shared engine used by strategy.analyze_symbol
+indicator_engine = IndicatorEngine()
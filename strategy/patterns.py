@@ -0,0 +1,116 @@
+import numpy as np
+
+# Column order of the stacked (symbols × bars × OHLCV) array
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+PATTERNS = ('bullish_engulfing', 'bearish_engulfing', 'pin_bar', 'doji', 'inside_bar')
+
+
+def _shift(x):
+    """Previous bar along the last axis; the first bar gets NaN, like pandas shift(1)."""
+    prev = np.empty_like(x)
+    prev[..., 0] = np.nan
+    prev[..., 1:] = x[..., :-1]
+    return prev
+
+
+def detect_patterns_stacked(ohlcv: np.ndarray, pin_ratio=2.0, doji_ratio=0.1) -> dict:
+    """
+    Vectorized detect_candle_patterns for many symbols at once.
+
+    `ohlcv` is a float array shaped (symbols, bars, 5) in OHLCV column order.
+    Returns a dict of boolean (symbols, bars) arrays with the same flags as
+    detect_candle_patterns; every intermediate is computed once.
+    """
+    ohlcv = np.asarray(ohlcv, dtype=np.float64)
+    o = ohlcv[..., OPEN]
+    h = ohlcv[..., HIGH]
+    l = ohlcv[..., LOW]
+    c = ohlcv[..., CLOSE]
+
+    prev_o = _shift(o)
+    prev_c = _shift(c)
+
+    bullish = c > o
+    bearish = c < o
+    prev_bullish = prev_c > prev_o
+    prev_bearish = prev_c < prev_o
+
+    body_top = np.maximum(o, c)
+    body_bottom = np.minimum(o, c)
+    upper_wick = h - body_top
+    lower_wick = body_bottom - l
+
+    # NaN comparisons are False, so the first bar never matches a two-bar pattern
+    with np.errstate(invalid='ignore'):
+        return {
+            'bullish_engulfing': prev_bearish & bullish & (c > prev_o) & (o < prev_c),
+            'bearish_engulfing': prev_bullish & bearish & (o > prev_c) & (c < prev_o),
+            'pin_bar': (upper_wick > pin_ratio * lower_wick) | (lower_wick > pin_ratio * upper_wick),
+            'doji': np.abs(c - o) <= (h - l) * doji_ratio,
+            'inside_bar': (h < _shift(h)) & (l > _shift(l)),
+        }
+
+
+def stack_candles(frames, bars=None) -> np.ndarray:
+    """Stack per-symbol column dicts/DataFrames into a (symbols, bars, 5) array, keeping the newest `bars`."""
+    bars = bars or min(len(frame['close']) for frame in frames)
+    out = np.empty((len(frames), bars, len(OHLCV)), dtype=np.float64)
+    for i, frame in enumerate(frames):
+        for j, field in enumerate(OHLCV):
+            out[i, :, j] = np.asarray(frame[field], dtype=np.float64)[-bars:]
+    return out
+
+
+class IncrementalPatternDetector:
+    """
+    Per-symbol streaming pattern detector. Keeps only the previous bar and
+    updates the flags in O(1) per bar, matching detect_candle_patterns on
+    the newest row.
+    """
+
+    __slots__ = ("pin_ratio", "doji_ratio", "_prev", "_last", "flags")
+
+    def __init__(self, pin_ratio=2.0, doji_ratio=0.1):
+        self.pin_ratio = pin_ratio
+        self.doji_ratio = doji_ratio
+        self._prev = None  # bar before the newest one
+        self._last = None  # newest bar
+        self.flags = None
+
+    def update(self, o, h, l, c) -> dict:
+        """Feed a new bar and return its flags."""
+        self._prev = self._last
+        self._last = (o, h, l, c)
+        self.flags = self._evaluate(self._prev, self._last)
+        return self.flags
+
+    def replace_last(self, o, h, l, c) -> dict:
+        """Re-evaluate after the newest (still forming) bar changed."""
+        if self._last is None:
+            return self.update(o, h, l, c)
+        self._last = (o, h, l, c)
+        self.flags = self._evaluate(self._prev, self._last)
+        return self.flags
+
+    def _evaluate(self, prev, bar):
+        o, h, l, c = bar
+        body_top = o if o > c else c
+        body_bottom = c if o > c else o
+        upper_wick = h - body_top
+        lower_wick = body_bottom - l
+
+        flags = {
+            'bullish_engulfing': False,
+            'bearish_engulfing': False,
+            'pin_bar': upper_wick > self.pin_ratio * lower_wick or lower_wick > self.pin_ratio * upper_wick,
+            'doji': abs(c - o) <= (h - l) * self.doji_ratio,
+            'inside_bar': False,
+        }
+        if prev is not None:
+            po, ph, pl, pc = prev
+            flags['bullish_engulfing'] = pc < po and c > o and c > po and o < pc
+            flags['bearish_engulfing'] = pc > po and c < o and o > pc and c < po
+            flags['inside_bar'] = h < ph and l > pl
+        return flags
@@ -1,14 +1,16 @@
-import requests
 import pandas as pd
 import numpy as np
-import datetime
 from typing import Optional
 from sqlalchemy.orm import Session
 
 from app.models import User  # Make sure this path is correct
-
-FINNHUB_API_KEY = 'YOUR_NEWS_API_KEY'  # Replace with your actual key or use os.getenv
-NEWS_ENDPOINT = 'https://newsapi.org/v2/everything'
+from config import SYMBOLS
+from market_data.candle_cache import candle_cache
+from market_data.streaming import StreamingMarketFeed
+from news.client import news_client
+from news.ingest import news_ingester
+from strategy.indicators import compute_indicators, indicator_engine
+from strategy.patterns import IncrementalPatternDetector
 
 
 # === Candle Pattern Detection ===
@@ -35,49 +37,36 @@ def detect_candle_patterns(df):
 
 
 # === News Sentiment Filter ===
-def check_news_sentiment(symbol: str, lookback_minutes=60) -> Optional[str]:
-    now = datetime.datetime.utcnow()
-    from_time = (now - datetime.timedelta(minutes=lookback_minutes)).isoformat()
-    params = {
-        'q': symbol,
-        'from': from_time,
-        'sortBy': 'publishedAt',
-        'apiKey': FINNHUB_API_KEY,
-        'language': 'en',
-        'pageSize': 10
-    }
-    try:
-        response = requests.get(NEWS_ENDPOINT, params=params)
-        news = response.json()
-        if 'articles' in news and len(news['articles']) > 0:
-            titles = [article['title'] for article in news['articles']]
-            sentiments = [
-                'positive' if 'gain' in title.lower() or 'bull' in title.lower()
-                else 'negative' if 'fall' in title.lower() or 'bear' in title.lower()
-                else 'neutral'
-                for title in titles
-            ]
-            overall_sentiment = max(set(sentiments), key=sentiments.count)
-            return overall_sentiment
-    except:
-        pass
-    return None
+async def check_news_sentiment(symbol: str, lookback_minutes=60) -> Optional[str]:
+    # Local index read when the bulk ingester is running, otherwise a pooled, cached API lookup
+    if news_ingester.running:
+        return news_ingester.index.sentiment(symbol, lookback_minutes)
+    return await news_client.get_sentiment(symbol, lookback_minutes)
 
 
 # === Trade Signal Generator ===
-def generate_trade_signal(df: pd.DataFrame, db: Session, user_id: int) -> str:
+async def generate_trade_signal(df: pd.DataFrame, db: Session, user_id: int, indicators=None, symbol: str = 'EURUSD') -> str:
+    """
+    `indicators` is a shared snapshot from the indicator engine; without one
+    it is computed from `df` once here.
+    """
     user = db.query(User).filter(User.id == user_id).first()
     if not user or not user.bot_active:
         return 'INACTIVE'
 
     df = detect_candle_patterns(df)
     last = df.iloc[-1]
-    rsi = last.get('rsi', 50)
-    sentiment = check_news_sentiment('EURUSD')
-
-    if df['bullish_engulfing'].iloc[-1] and last['volume'] > df['volume'].rolling(10).mean().iloc[-1] and rsi < 30 and sentiment == 'positive':
+    if indicators is None:
+        indicators = compute_indicators(df)
+    rsi = indicators.get('rsi')
+    rsi = 50 if rsi is None else rsi
+    volume_mean = indicators.get('volume_mean')
+    high_volume = volume_mean is not None and last['volume'] > volume_mean
+    sentiment = await check_news_sentiment(symbol)
+
+    if df['bullish_engulfing'].iloc[-1] and high_volume and rsi < 30 and sentiment == 'positive':
         return 'BUY'
-    elif df['bearish_engulfing'].iloc[-1] and last['volume'] > df['volume'].rolling(10).mean().iloc[-1] and rsi > 70 and sentiment == 'negative':
+    elif df['bearish_engulfing'].iloc[-1] and high_volume and rsi > 70 and sentiment == 'negative':
         return 'SELL'
     elif df['pin_bar'].iloc[-1] and sentiment == 'positive' and rsi < 40:
         return 'BUY'
@@ -91,27 +80,46 @@ def generate_trade_signal(df: pd.DataFrame, db: Session, user_id: int) -> str:
 
 
 # === Exported strategy functions for execution.py ===
-async def analyze_symbol(metaapi, account_id, symbol: str) -> Optional[dict]:
-    # Simulate candle fetching (replace with real data if needed)
-    candles = await metaapi.history_api.get_candles(
-        account_id, symbol, timeframe='1h',
-        start=datetime.datetime.utcnow() - datetime.timedelta(hours=50)
-    )
-    df = pd.DataFrame(candles)
-    df = detect_candle_patterns(df)
+async def analyze_symbol(metaapi, account_id, symbol: str, timeframe: str = '1h') -> Optional[dict]:
+    # Shared across users: one incremental fetch per symbol per closed bar.
+    # Timeframes above the base one are resampled locally without extra API calls.
+    candles = await candle_cache.get_candles(metaapi, account_id, symbol, timeframe=timeframe, bars=50)
+    analysis = analyze_candles(candles)
+    if analysis is not None:
+        # Read-only snapshot shared by every user analysing this symbol
+        analysis['indicators'] = indicator_engine.sync(symbol, timeframe, candles)
+    return analysis
+
+
+def analyze_candles(candles: dict, detector: IncrementalPatternDetector = None) -> Optional[dict]:
+    """
+    Score the newest bar of a column dict (as returned by the candle store).
+    Only the newest bar's flags are needed, so they are computed in O(1):
+    either by a per-symbol `detector` already fed the previous bars, or by a
+    fresh one primed with the previous bar.
+    """
+    n = len(candles['close'])
+    if not n:
+        return None
+    o, h, l, c = candles['open'], candles['high'], candles['low'], candles['close']
+    if detector is None:
+        detector = IncrementalPatternDetector()
+        if n > 1:
+            detector.update(o[-2], h[-2], l[-2], c[-2])
+    flags = detector.update(o[-1], h[-1], l[-1], c[-1])
 
     score = 0
-    if df['bullish_engulfing'].iloc[-1]:
+    if flags['bullish_engulfing']:
         score += 3
-    if df['pin_bar'].iloc[-1]:
+    if flags['pin_bar']:
         score += 2
 
-    direction = 'buy' if df['bullish_engulfing'].iloc[-1] else 'sell' if df['bearish_engulfing'].iloc[-1] else 'hold'
+    direction = 'buy' if flags['bullish_engulfing'] else 'sell' if flags['bearish_engulfing'] else 'hold'
 
     return {
         'score': score,
         'direction': direction,
-        'volume': df['volume'].iloc[-1]
+        'volume': candles['volume'][-1]
     }
 
 
@@ -172,6 +180,25 @@ def score_trade(trade_signal):
 
 
 # === Async Strategy Hook (Optional) ===
-async def strategy(connection):
+async def strategy(connection, symbols=SYMBOLS, timeframe='1h', on_signal=None):
+    """
+    Streaming mode: subscribe once per symbol and analyze each bar as soon as
+    it closes. `on_signal(symbol, analysis)` is awaited for tradeable setups.
+    """
     print("Running strategy...")
-    await connection.subscribe_to_market_data('EURUSD')
+    feed = StreamingMarketFeed(connection, symbols, timeframe=timeframe)
+    detectors = {symbol: IncrementalPatternDetector() for symbol in symbols}
+
+    @feed.on_bar_close
+    async def handle_bar_close(symbol, candles):
+        detector = detectors[symbol]
+        if detector.flags is None and len(candles['close']) > 1:
+            # First closed bar seen by this detector: prime it with the bar before
+            detector.update(candles['open'][-2], candles['high'][-2], candles['low'][-2], candles['close'][-2])
+        analysis = analyze_candles(candles, detector)
+        print(f"[STREAM][BAR] {symbol} closed → {analysis}")
+        if on_signal is not None and should_trade(analysis):
+            await on_signal(symbol, analysis)
+
+    await feed.start()
+    return feed
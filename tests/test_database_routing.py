@@ -0,0 +1,76 @@
+"""RoutingSession read/write routing over local SQLite primary and replica files."""
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, select
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.database import RoutingSession
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+@pytest.fixture
+def engines(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, name in ((primary, 'from-primary'), (replica, 'from-replica')):
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(Item.__table__.insert(), [{'id': 1, 'name': name}])
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def make_session(primary, replicas):
+    return sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)()
+
+
+def test_reads_go_to_the_replica(engines):
+    primary, replica = engines
+    with make_session(primary, [replica]) as db:
+        assert db.execute(select(Item.name)).scalar_one() == 'from-replica'
+        assert not db.pinned
+
+
+def test_writes_go_to_the_primary_and_later_reads_follow(engines):
+    primary, replica = engines
+    with make_session(primary, [replica]) as db:
+        db.add(Item(id=2, name='written'))
+        db.commit()
+        assert db.pinned
+        # Read-your-writes: the rest of the request reads from the primary
+        assert db.execute(select(Item.name).where(Item.id == 2)).scalar_one() == 'written'
+        assert db.execute(select(Item.name).where(Item.id == 1)).scalar_one() == 'from-primary'
+    with replica.connect() as conn:
+        assert conn.execute(select(Item.name).where(Item.id == 2)).first() is None
+
+
+def test_dml_statement_pins_the_session(engines):
+    primary, replica = engines
+    with make_session(primary, [replica]) as db:
+        db.execute(Item.__table__.update().where(Item.id == 1).values(name='updated'))
+        db.commit()
+        assert db.execute(select(Item.name)).scalar_one() == 'updated'
+    with replica.connect() as conn:
+        assert conn.execute(select(Item.name)).scalar_one() == 'from-replica'
+
+
+def test_locking_read_and_use_primary_hit_the_primary(engines):
+    primary, replica = engines
+    with make_session(primary, [replica]) as db:
+        assert db.execute(select(Item.name).with_for_update()).scalar_one() == 'from-primary'
+    with make_session(primary, [replica]).use_primary() as db:
+        assert db.execute(select(Item.name)).scalar_one() == 'from-primary'
+
+
+def test_without_replicas_everything_uses_the_primary(engines):
+    primary, _ = engines
+    with make_session(primary, []) as db:
+        assert db.execute(select(Item.name)).scalar_one() == 'from-primary'
@@ -0,0 +1,112 @@
+"""NewsSentimentClient against a local stub HTTP server."""
+import asyncio
+
+from aiohttp import web
+
+from news.client import NewsSentimentClient
+from news.ingest import HeadlineIndex, HeadlineIngester
+
+
+class StubNewsServer:
+    """Serves a fixed article list; `delay` makes every response slow."""
+
+    def __init__(self, titles, delay=0.0):
+        self.titles = titles
+        self.delay = delay
+        self.requests = []
+        self._runner = None
+        self.url = None
+
+    async def handle(self, request):
+        self.requests.append(dict(request.query))
+        await asyncio.sleep(self.delay)
+        size = int(request.query.get('pageSize', len(self.titles) or 1))
+        start = (int(request.query.get('page', 1)) - 1) * size
+        titles = self.titles[start:start + size]
+        return web.json_response({'articles': [{'title': title, 'url': title} for title in titles]})
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get('/v2/everything', self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/v2/everything"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_sentiment_is_cached_per_symbol_and_lookback():
+    async def scenario():
+        async with StubNewsServer(['Stocks rally to record high', 'Euro surges']) as server:
+            client = NewsSentimentClient(endpoint=server.url, api_key='test', ttl=60)
+            try:
+                first = await client.get_sentiment('EURUSD', 60)
+                again = await client.get_sentiment('EURUSD', 60)
+                other = await client.get_sentiment('EURUSD', 30)
+            finally:
+                await client.close()
+            return first, again, other, server.requests, client.stats()
+
+    first, again, other, requests, stats = run(scenario())
+    assert first == again == other == 'positive'
+    assert [request['q'] for request in requests] == ['EURUSD', 'EURUSD']
+    assert stats['misses'] == 2 and stats['hits'] == 1
+
+
+def test_concurrent_lookups_share_one_request():
+    async def scenario():
+        async with StubNewsServer(['Markets slump'], delay=0.05) as server:
+            client = NewsSentimentClient(endpoint=server.url, api_key='test')
+            try:
+                results = await asyncio.gather(*(client.get_sentiment('GBPUSD') for _ in range(20)))
+            finally:
+                await client.close()
+            return results, len(server.requests)
+
+    results, requests = run(scenario())
+    assert results == ['negative'] * 20
+    assert requests == 1
+
+
+def test_timeout_returns_none_and_is_not_cached():
+    async def scenario():
+        async with StubNewsServer(['Euro surges'], delay=0.5) as server:
+            client = NewsSentimentClient(endpoint=server.url, api_key='test', timeout=0.05)
+            try:
+                timed_out = await client.get_sentiment('EURUSD')
+                server.delay = 0.0
+                retried = await client.get_sentiment('EURUSD')
+            finally:
+                await client.close()
+            return timed_out, retried, client.errors
+
+    timed_out, retried, errors = run(scenario())
+    assert timed_out is None
+    assert retried == 'positive'
+    assert errors == 1
+
+
+def test_ingester_pages_until_a_short_page():
+    async def scenario():
+        titles = [f"Euro surges {i}" for i in range(25)]
+        async with StubNewsServer(titles) as server:
+            client = NewsSentimentClient(endpoint=server.url, api_key='test')
+            ingester = HeadlineIngester(client=client, index=HeadlineIndex(symbols=['EURUSD']), page_size=10)
+            try:
+                added = await ingester.pull()
+            finally:
+                await client.close()
+            return added, server.requests
+
+    added, requests = run(scenario())
+    assert added == 25
+    assert [request['page'] for request in requests] == ['1', '2', '3']
+    assert not requests[0]['from'].endswith('+00:00')
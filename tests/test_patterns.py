@@ -0,0 +1,83 @@
+"""IncrementalPatternDetector and detect_patterns_stacked against detect_candle_patterns."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy.patterns import PATTERNS, IncrementalPatternDetector, detect_patterns_stacked
+from strategy.strategy import detect_candle_patterns
+
+
+def reference_flags(bars):
+    df = detect_candle_patterns(pd.DataFrame(bars, columns=['open', 'high', 'low', 'close']).astype(float))
+    return [{name: bool(df[name].iloc[i]) for name in PATTERNS} for i in range(len(df))]
+
+
+def incremental_flags(bars):
+    detector = IncrementalPatternDetector()
+    return [{name: bool(flags[name]) for name in PATTERNS} for flags in (detector.update(*bar) for bar in bars)]
+
+
+def random_bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 1 + np.cumsum(rng.normal(0, 0.001, n))
+    open_ = close + rng.normal(0, 0.0005, n)
+    high = np.maximum(open_, close) + rng.exponential(0.0005, n)
+    low = np.minimum(open_, close) - rng.exponential(0.0005, n)
+    return [tuple(row) for row in np.column_stack([open_, high, low, close])]
+
+
+CASES = {
+    'flat': [(1.0, 1.0, 1.0, 1.0)] * 4,
+    'flat_after_move': [(1.0, 1.2, 0.9, 1.1), (1.1, 1.1, 1.1, 1.1), (1.1, 1.1, 1.1, 1.1)],
+    # Open equal to the previous close and close equal to the previous open: strict comparisons must fail
+    'equal_open_close': [(1.2, 1.3, 1.0, 1.1), (1.1, 1.3, 1.0, 1.2), (1.2, 1.3, 1.0, 1.1)],
+    'equal_highs_lows': [(1.0, 1.5, 0.5, 1.2), (1.1, 1.5, 0.5, 1.0), (1.0, 1.4, 0.6, 1.1)],
+    'engulfing': [(1.2, 1.25, 1.05, 1.1), (1.05, 1.3, 1.0, 1.25), (1.3, 1.35, 0.95, 1.0)],
+    'single_bar': [(1.0, 1.3, 0.9, 1.05)],
+}
+
+
+@pytest.mark.parametrize('name', sorted(CASES))
+def test_incremental_matches_pandas_edge_cases(name):
+    bars = CASES[name]
+    assert incremental_flags(bars) == reference_flags(bars)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_matches_pandas_random(seed):
+    bars = random_bars(500, seed)
+    assert incremental_flags(bars) == reference_flags(bars)
+
+
+def test_first_bar_has_no_two_bar_patterns():
+    flags = IncrementalPatternDetector().update(1.0, 2.0, 0.5, 1.8)
+    assert not flags['bullish_engulfing'] and not flags['bearish_engulfing'] and not flags['inside_bar']
+    assert flags == {name: reference_flags([(1.0, 2.0, 0.5, 1.8)])[0][name] for name in PATTERNS}
+
+
+def test_replace_last_matches_a_fresh_update():
+    bars = random_bars(50, 7)
+    detector = IncrementalPatternDetector()
+    for bar in bars[:-1]:
+        detector.update(*bar)
+    # The forming bar ticks a few times before its final values
+    o, h, l, c = bars[-1]
+    detector.update(o, o, o, o)
+    detector.replace_last(o, h, l, (o + c) / 2)
+    flags = detector.replace_last(o, h, l, c)
+    assert {name: bool(flags[name]) for name in PATTERNS} == reference_flags(bars)[-1]
+
+
+def test_replace_last_without_history_is_update():
+    assert IncrementalPatternDetector().replace_last(1.0, 1.2, 0.9, 1.1) == \
+        IncrementalPatternDetector().update(1.0, 1.2, 0.9, 1.1)
+
+
+@pytest.mark.parametrize('name', sorted(CASES))
+def test_stacked_kernel_matches_pandas(name):
+    bars = CASES[name] if len(CASES[name]) > 1 else CASES[name] * 2
+    ohlcv = np.array([bar + (1.0,) for bar in bars], dtype=np.float64)[None]
+    flags = detect_patterns_stacked(ohlcv)
+    expected = reference_flags(bars)
+    for i in range(len(bars)):
+        assert {name: bool(flags[name][0][i]) for name in PATTERNS} == expected[i]